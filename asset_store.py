@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+図や画像を内容のハッシュで管理する置き場（assets/media/）
+
+同じ内容の画像は、どのチュートリアルの例から作られても1つのファイルとして保存され、
+すべてのページから同じURLで参照される（例の図はチュートリアルをまたいで同じものが多い）。
+PNG/JPEG には、Pillow があれば WebP と AVIF の版も作り、<picture> で対応するブラウザに選ばせる。
+AVIF は Pillow が対応している場合だけ作る（pip install pillow）。
+
+Markdownの画像（![説明](images/foo.png)）も、Markdownの拡張機能 LazyImageExtension で
+この置き場に入れ、loading="lazy" を付けて出力する。
+
+使い方:
+    python asset_store.py                     # 置き場のファイル数と、重複をまとめて減ったサイズを表示
+"""
+
+import glob
+import hashlib
+import html
+import json
+import os
+import struct
+import xml.etree.ElementTree as etree
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MEDIA_DIR = os.path.join(BASE_DIR, 'assets', 'media')
+STATS_FILE = os.path.join(BASE_DIR, '.build_cache', 'media.json')
+HASH_LENGTH = 16
+
+# 別の形式の版を作る画像と、作る形式（優先する順）
+RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+VARIANT_FORMATS = [('.avif', 'AVIF', 'image/avif'), ('.webp', 'WEBP', 'image/webp')]
+VARIANT_QUALITY = 80
+
+
+def media_url(path):
+    """置き場のファイルのURL（サイトのトップからの相対パス）"""
+    return os.path.relpath(path, BASE_DIR).replace(os.sep, '/')
+
+
+def variant_formats():
+    """このPillowで作れる形式"""
+    if Image is None:
+        return []
+    return [(extension, name, mime) for extension, name, mime in VARIANT_FORMATS
+            if features.check(name.lower())]
+
+
+def write_variants(path):
+    """PNG/JPEG から WebP/AVIF の版を作る（元より大きくなるものは作らない）"""
+    if not path.lower().endswith(RASTER_EXTENSIONS):
+        return
+    stem = os.path.splitext(path)[0]
+    size = os.path.getsize(path)
+    for extension, name, _ in variant_formats():
+        target = stem + extension
+        if os.path.exists(target) or os.path.exists(target + '.skip'):
+            continue
+        with Image.open(path) as image:
+            tmp_file = target + '.tmp'
+            image.save(tmp_file, format=name, quality=VARIANT_QUALITY)
+        if os.path.getsize(tmp_file) < size:
+            os.replace(tmp_file, target)
+        else:
+            # 小さくならなかったことを記録し、次回また変換しないようにする
+            os.remove(tmp_file)
+            open(target + '.skip', 'w').close()
+
+
+def media_path(content, extension):
+    """内容を置き場に入れたときのパス（内容のハッシュのファイル名）"""
+    name = hashlib.sha256(content).hexdigest()[:HASH_LENGTH] + extension.lower()
+    return os.path.join(MEDIA_DIR, name)
+
+
+def store_bytes(content, extension):
+    """内容をハッシュのファイル名で置き場に書き出し（同じ内容がすでにあれば何もしない）、そのパスを返す"""
+    path = media_path(content, extension)
+    if not os.path.exists(path):
+        os.makedirs(MEDIA_DIR, exist_ok=True)
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_file, path)
+    write_variants(path)
+    return path
+
+
+def store_file(source_path):
+    """ファイルを置き場に入れ、そのURL（assets/media/<hash>.<拡張子>）を返す"""
+    with open(source_path, 'rb') as f:
+        content = f.read()
+    return media_url(store_bytes(content, os.path.splitext(source_path)[1]))
+
+
+def file_url(source_path):
+    """store_file() が返すURL（置き場には書き出さない）"""
+    with open(source_path, 'rb') as f:
+        content = f.read()
+    return media_url(media_path(content, os.path.splitext(source_path)[1]))
+
+
+def image_size(path):
+    """PNG の幅と高さ（ほかの形式や読めない場合は None）"""
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    if header[:8] == b'\x89PNG\r\n\x1a\n' and header[12:16] == b'IHDR':
+        return struct.unpack('>II', header[16:24])
+    return None
+
+
+def variants(url):
+    """置き場の画像にある別の形式の版の (URL, MIMEタイプ) のリスト"""
+    stem = os.path.splitext(os.path.join(BASE_DIR, url))[0]
+    return [
+        (media_url(stem + extension), mime)
+        for extension, _, mime in VARIANT_FORMATS
+        if os.path.exists(stem + extension)
+    ]
+
+
+def image_attributes(url, alt):
+    """<img> の属性（遅延読み込み・大きさ）"""
+    attributes = {'src': url, 'alt': alt, 'loading': 'lazy', 'decoding': 'async'}
+    size = image_size(os.path.join(BASE_DIR, url))
+    if size:
+        # 読み込み前から場所を確保して、表示中にページがずれないようにする
+        attributes['width'], attributes['height'] = str(size[0]), str(size[1])
+    return attributes
+
+
+def image_html(url, alt):
+    """置き場の画像を表示するHTML（別の形式の版があれば <picture>）"""
+    attributes = image_attributes(url, alt)
+    img = '<img ' + ' '.join(f'{key}="{html.escape(value)}"' for key, value in attributes.items()) + '>'
+    sources = variants(url)
+    if not sources:
+        return img
+    return '<picture>' + ''.join(
+        f'<source srcset="{source}" type="{mime}">' for source, mime in sources
+    ) + img + '</picture>'
+
+
+def remove_media(urls):
+    """置き場から urls（と、その別の形式の版）を削除する"""
+    for url in urls:
+        stem = os.path.splitext(os.path.join(BASE_DIR, url))[0]
+        for path in glob.glob(glob.escape(stem) + '.*'):
+            os.remove(path)
+
+
+def load_references():
+    """記録した {ページや例の名前: 使っている画像のURLのリスト}"""
+    try:
+        with open(STATS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def record_references(name, urls):
+    """どのページ（例など）がどの画像を何回使っているかを記録する（重複の集計と、消してよい画像の判断に使う）"""
+    references = load_references()
+    references[name] = list(urls)
+    os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+    with open(STATS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(references, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def usage_stats():
+    """(参照の数, ファイルの数, 置き場のサイズ, 重複をまとめなかった場合のサイズ)"""
+    references = load_references()
+    urls = [url for page_urls in references.values() for url in page_urls]
+    existing = [url for url in urls if os.path.exists(os.path.join(BASE_DIR, url))]
+    stored = sum(os.path.getsize(path) for path in glob.glob(os.path.join(MEDIA_DIR, '*')))
+    duplicated = sum(os.path.getsize(os.path.join(BASE_DIR, url)) for url in existing)
+    return len(existing), len(set(existing)), stored, duplicated
+
+
+class LazyImageTreeprocessor(Treeprocessor):
+    """Markdownの画像をハッシュの置き場に入れ、遅延読み込みの <img>（や <picture>）にする"""
+
+    def run(self, root):
+        # <picture> で包むと木が変わるので、先に画像を集めておく
+        images = [(parent, element) for parent in root.iter() for element in parent
+                  if element.tag == 'img']
+        for parent, element in images:
+            src = element.get('src', '')
+            local = os.path.join(BASE_DIR, src)
+            if '://' in src or src.startswith(('/', 'data:')) or not os.path.isfile(local):
+                # 外部の画像はそのまま、遅延読み込みだけにする
+                element.set('loading', 'lazy')
+                continue
+            url = store_file(local)
+            for key, value in image_attributes(url, element.get('alt', '')).items():
+                element.set(key, value)
+            sources = variants(url)
+            if sources:
+                picture = etree.Element('picture')
+                for source_url, mime in sources:
+                    etree.SubElement(picture, 'source', {'srcset': source_url, 'type': mime})
+                index = list(parent).index(element)
+                picture.tail, element.tail = element.tail, None
+                parent.remove(element)
+                picture.append(element)
+                parent.insert(index, picture)
+
+
+class LazyImageExtension(Extension):
+    def extendMarkdown(self, md):
+        md.treeprocessors.register(LazyImageTreeprocessor(md), 'lazy_image', 5)
+
+
+def makeExtension(**kwargs):
+    return LazyImageExtension(**kwargs)
+
+
+def main():
+    references, files, stored, duplicated = usage_stats()
+    print(f"画像の参照 {references}件 → ファイル {files}件")
+    print(f"置き場のサイズ {stored:,} bytes（重複をまとめない場合の元の画像 {duplicated:,} bytes）")
+    if Image is None:
+        print("Pillow がインストールされていないため、WebP/AVIF の版は作りません（pip install pillow）。")
+    else:
+        print("作る版: " + (', '.join(name for _, name, _ in variant_formats()) or 'なし'))
+
+
+if __name__ == "__main__":
+    main()
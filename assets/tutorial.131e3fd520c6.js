@@ -0,0 +1,373 @@
+(function () {
+if (!document.documentElement.classList.contains('page-beginner')) return;
+document.querySelector('.back-to-top').addEventListener('click', function(e) {
+e.preventDefault();
+window.scrollTo({
+top: 0,
+behavior: 'smooth'
+});
+});
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+anchor.addEventListener('click', function (e) {
+e.preventDefault();
+const target = document.getElementById(decodeURIComponent(this.getAttribute('href').slice(1)));
+if (target) {
+target.scrollIntoView({
+behavior: 'smooth',
+block: 'start'
+});
+}
+});
+});
+document.querySelectorAll('pre').forEach(pre => {
+const button = document.createElement('button');
+button.textContent = 'コピー';
+button.style.cssText = `
+position: absolute;
+top: 10px;
+right: 10px;
+background: #3498db;
+color: white;
+border: none;
+padding: 5px 10px;
+border-radius: 3px;
+cursor: pointer;
+font-size: 12px;
+`;
+pre.style.position = 'relative';
+pre.appendChild(button);
+button.addEventListener('click', () => {
+const code = pre.querySelector('code') || pre;
+navigator.clipboard.writeText(code.textContent).then(() => {
+button.textContent = 'コピー完了!';
+setTimeout(() => {
+button.textContent = 'コピー';
+}, 2000);
+});
+});
+});
+})();
+(function () {
+const script = document.currentScript;
+if (!script || !script.src) return;
+const root = new URL('../', script.src);
+const searchDir = new URL('search/', root);
+const TOKEN_RE = /[a-z0-9_]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+/g;
+const MAX_RESULTS = 20;
+function tokenize(text) {
+const tokens = [];
+const words = text.normalize('NFKC').toLowerCase().match(TOKEN_RE) || [];
+for (const word of words) {
+if (/^[a-z0-9_]/.test(word)) {
+if (word.length > 1) tokens.push(word);
+} else if (word.length === 1) {
+tokens.push(word);
+} else {
+for (let i = 0; i < word.length - 1; i++) tokens.push(word.slice(i, i + 2));
+}
+}
+return tokens;
+}
+let manifest = null;
+let termIndex = null;
+const shards = {};
+function loadManifest() {
+if (!manifest) {
+manifest = fetch(new URL('index.json', searchDir), {cache: 'no-cache'})
+.then(response => response.json());
+}
+return manifest;
+}
+function loadTermIndex() {
+if (!termIndex) {
+termIndex = loadManifest()
+.then(data => fetch(new URL(data.terms, searchDir)))
+.then(response => response.json());
+}
+return termIndex;
+}
+function loadShard(tutorial) {
+if (!shards[tutorial.shard]) {
+shards[tutorial.shard] = fetch(new URL(tutorial.shard, searchDir))
+.then(response => response.json());
+}
+return shards[tutorial.shard];
+}
+function postings(shard, token) {
+if (/^[a-z0-9_]/.test(token)) {
+const result = [];
+for (const term in shard.terms) {
+if (term.startsWith(token)) result.push(shard.terms[term]);
+}
+return result;
+}
+return shard.terms[token] ? [shard.terms[token]] : [];
+}
+function candidateTutorials(index, tokens) {
+let candidates = null;
+for (const token of new Set(tokens)) {
+const found = new Set();
+for (const list of postings(index, token)) {
+for (const number of list) found.add(number);
+}
+candidates = candidates === null
+? found
+: new Set([...candidates].filter(number => found.has(number)));
+if (candidates.size === 0) break;
+}
+return candidates || new Set();
+}
+function searchShard(shard, tokens) {
+let scores = null;
+for (const token of new Set(tokens)) {
+const found = new Map();
+for (const list of postings(shard, token)) {
+for (let i = 0; i < list.length; i += 2) {
+found.set(list[i], (found.get(list[i]) || 0) + list[i + 1]);
+}
+}
+if (scores === null) {
+scores = found;
+} else {
+for (const [doc, score] of scores) {
+if (found.has(doc)) scores.set(doc, score + found.get(doc));
+else scores.delete(doc);
+}
+}
+if (scores.size === 0) break;
+}
+return scores ? Array.from(scores) : [];
+}
+function currentPage() {
+const path = location.pathname.split('/');
+return decodeURIComponent(path[path.length - 1]);
+}
+function createWidget() {
+const box = document.createElement('div');
+box.className = 'site-search';
+box.innerHTML =
+'<input type="search" placeholder="チュートリアルを検索（/）" aria-label="チュートリアルを検索">' +
+'<ol class="site-search-results" hidden></ol>';
+document.body.appendChild(box);
+return box;
+}
+const box = createWidget();
+const input = box.querySelector('input');
+const results = box.querySelector('.site-search-results');
+let latest = 0;
+function render(hits) {
+results.textContent = '';
+for (const hit of hits.slice(0, MAX_RESULTS)) {
+const item = document.createElement('li');
+const link = document.createElement('a');
+link.href = new URL(hit.tutorial.href + '#' + hit.id, root).href;
+link.textContent = hit.title;
+const source = document.createElement('span');
+source.textContent = hit.tutorial.title;
+link.appendChild(source);
+item.appendChild(link);
+results.appendChild(item);
+}
+if (!hits.length) {
+const item = document.createElement('li');
+item.className = 'site-search-empty';
+item.textContent = '見つかりませんでした';
+results.appendChild(item);
+}
+results.hidden = false;
+}
+async function search(query) {
+const request = ++latest;
+const tokens = tokenize(query);
+if (!tokens.length) {
+results.hidden = true;
+return;
+}
+const [{tutorials}, index] = await Promise.all([loadManifest(), loadTermIndex()]);
+const candidates = candidateTutorials(index, tokens);
+const page = currentPage();
+const hits = [];
+await Promise.all(tutorials.filter((_, number) => candidates.has(number)).map(async tutorial => {
+const shard = await loadShard(tutorial);
+const bonus = tutorial.href === page ? 1000 : 0;
+for (const [doc, score] of searchShard(shard, tokens)) {
+const [id, title] = shard.docs[doc];
+hits.push({tutorial, id, title, score: score + bonus});
+}
+}));
+if (request !== latest) return;
+hits.sort((a, b) => b.score - a.score);
+render(hits);
+}
+let timer = null;
+input.addEventListener('input', () => {
+clearTimeout(timer);
+timer = setTimeout(() => search(input.value).catch(() => {
+results.hidden = true;
+}), 150);
+});
+input.addEventListener('focus', () => {
+loadTermIndex().catch(() => {});
+if (input.value) results.hidden = false;
+});
+input.addEventListener('keydown', e => {
+if (e.key === 'Escape') {
+results.hidden = true;
+input.blur();
+}
+});
+document.addEventListener('keydown', e => {
+if (e.key === '/' && document.activeElement !== input &&
+!/^(INPUT|TEXTAREA|SELECT)$/.test(document.activeElement.tagName)) {
+e.preventDefault();
+input.focus();
+}
+});
+document.addEventListener('click', e => {
+if (!box.contains(e.target)) results.hidden = true;
+});
+})();
+(function () {
+if (!document.documentElement.classList.contains('page-index')) return;
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+anchor.addEventListener('click', function (e) {
+e.preventDefault();
+const target = document.getElementById(decodeURIComponent(this.getAttribute('href').slice(1)));
+if (target) {
+target.scrollIntoView({
+behavior: 'smooth',
+block: 'start'
+});
+}
+});
+});
+window.addEventListener('scroll', function() {
+const header = document.querySelector('header');
+if (window.scrollY > 100) {
+header.style.background = 'rgba(255, 255, 255, 0.98)';
+header.style.boxShadow = '0 2px 25px rgba(0, 0, 0, 0.15)';
+} else {
+header.style.background = 'rgba(255, 255, 255, 0.95)';
+header.style.boxShadow = '0 2px 20px rgba(0, 0, 0, 0.1)';
+}
+});
+function animateCounter(element, target) {
+let current = 0;
+const increment = target / 50;
+const timer = setInterval(() => {
+current += increment;
+if (current >= target) {
+current = target;
+clearInterval(timer);
+}
+element.textContent = Math.floor(current) + (target === parseInt(target) ? '' : '+');
+}, 50);
+}
+const observer = new IntersectionObserver((entries) => {
+entries.forEach(entry => {
+if (entry.isIntersecting) {
+const statItems = entry.target.querySelectorAll('.stat-item h3');
+statItems.forEach((item, index) => {
+const targets = [11, 100, 6, 1];
+const suffixes = ['+', '+', '', ''];
+setTimeout(() => {
+let current = 0;
+const target = targets[index];
+const timer = setInterval(() => {
+current += Math.ceil(target / 30);
+if (current >= target) {
+current = target;
+clearInterval(timer);
+}
+if (index === 3) {
+item.textContent = '日本語';
+} else {
+item.textContent = current + suffixes[index];
+}
+}, 50);
+}, index * 200);
+});
+observer.unobserve(entry.target);
+}
+});
+});
+observer.observe(document.querySelector('.stats'));
+function createParticle() {
+const particle = document.createElement('div');
+particle.style.cssText = `
+position: fixed;
+width: 4px;
+height: 4px;
+background: rgba(255, 255, 255, 0.8);
+border-radius: 50%;
+pointer-events: none;
+animation: float 6s linear infinite;
+top: 100vh;
+left: ${Math.random() * 100}vw;
+z-index: 1;
+`;
+document.body.appendChild(particle);
+setTimeout(() => {
+particle.remove();
+}, 6000);
+}
+const style = document.createElement('style');
+style.textContent = `
+@keyframes float {
+0% {
+transform: translateY(0) rotate(0deg);
+opacity: 1;
+}
+100% {
+transform: translateY(-100vh) rotate(360deg);
+opacity: 0;
+}
+}
+`;
+document.head.appendChild(style);
+setInterval(createParticle, 3000);
+const logo = document.querySelector('.logo');
+const nav = document.querySelector('nav');
+logo.addEventListener('click', function(e) {
+if (window.innerWidth <= 768) {
+e.preventDefault();
+nav.style.display = nav.style.display === 'block' ? 'none' : 'block';
+}
+});
+window.addEventListener('resize', function() {
+if (window.innerWidth > 768) {
+nav.style.display = '';
+}
+});
+})();
+(function () {
+if (!document.documentElement.classList.contains('page-library')) return;
+window.addEventListener('scroll', function() {
+const scrollTop = document.getElementById('scrollTop');
+if (window.pageYOffset > 200) {
+scrollTop.classList.add('visible');
+} else {
+scrollTop.classList.remove('visible');
+}
+});
+document.getElementById('scrollTop').addEventListener('click', function(e) {
+e.preventDefault();
+window.scrollTo({
+top: 0,
+behavior: 'smooth'
+});
+});
+document.querySelectorAll('.toc a').forEach(anchor => {
+anchor.addEventListener('click', function(e) {
+e.preventDefault();
+const targetId = decodeURIComponent(this.getAttribute('href').substring(1));
+const targetElement = document.getElementById(targetId);
+if (targetElement) {
+targetElement.scrollIntoView({
+behavior: 'smooth',
+block: 'start'
+});
+}
+});
+});
+})();
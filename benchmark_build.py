@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+チュートリアルのビルド処理のベンチマーク
+
+実際の6つのチュートリアルと、それを10倍・100倍に水増ししたMarkdownを
+キャッシュなしで変換し、処理の段階ごとの時間を計測する。
+
+    read      Markdownファイルの読み込み
+    setup     markdown.Markdown の準備（拡張機能の読み込み）
+    parse     Markdownの解析とHTML化（highlight と toc を除く）
+    highlight Pygmentsによるコードブロックのハイライト
+    toc       toc拡張機能による見出しidの付与
+    template  HTMLテンプレートへの埋め込み
+    write     ファイルへの書き出し
+
+あわせて最大メモリ使用量（RSS）と出力サイズも記録し、結果をJSONで保存する。
+前回の結果を --compare に渡すと、段階ごとの差を表示する。
+--backends に複数のMarkdownのバックエンドを渡すと、変換（parse + highlight + toc）の
+速さ（MB/秒）をバックエンドごとに比べる。
+
+使い方:
+    python benchmark_build.py                        # 1倍・10倍・100倍をすべて計測
+    python benchmark_build.py --scales 1,10          # 倍率を指定
+    python benchmark_build.py --compare benchmark_results/abc1234.json
+    python benchmark_build.py --backends markdown,markdown-it --scales 1,10
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import build_tutorials
+
+RESULT_DIR = os.path.join(build_tutorials.BASE_DIR, 'benchmark_results')
+STAGES = ['read', 'setup', 'parse', 'highlight', 'toc', 'template', 'write']
+
+
+def inflate(md_content, scale):
+    """Markdownを scale 倍に水増しする（見出しのidは toc拡張機能が一意にする）"""
+    if scale == 1:
+        return md_content
+    return '\n\n'.join([md_content] * scale)
+
+
+def timed(timings, stage, function):
+    """function の実行時間を timings[stage] に足していくラッパー"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings[stage] += time.perf_counter() - start
+    return wrapper
+
+
+def peak_rss():
+    """このプロセスの最大メモリ使用量（バイト）"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS はバイトで返す
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def run_case(source, scale, backend='markdown'):
+    """1つのチュートリアルを1つの倍率で変換し、段階ごとの時間などを返す
+
+    最大メモリ使用量を正しく測るため、計測ごとに新しいプロセスで実行する。
+    """
+    from markdown.extensions.codehilite import CodeHilite
+    from markdown.extensions.toc import TocTreeprocessor
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    CodeHilite.hilite = timed(timings, 'highlight', CodeHilite.hilite)
+    TocTreeprocessor.run = timed(timings, 'toc', TocTreeprocessor.run)
+
+    settings = build_tutorials.tutorial_settings(source, backend)
+    assets = {'css': 'assets/tutorial.css', 'js': 'assets/tutorial.js'}
+
+    start = time.perf_counter()
+    with open(source, 'r', encoding='utf-8') as f:
+        md_content = inflate(f.read(), scale)
+    timings['read'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_tutorials.get_converter(settings['template'], backend)
+    timings['setup'] = time.perf_counter() - start
+
+    # キャッシュを使わずに文書全体を変換する
+    start = time.perf_counter()
+    html_body = build_tutorials.render_markdown(md_content, settings)
+    timings['parse'] = time.perf_counter() - start - timings['highlight'] - timings['toc']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, os.path.basename(build_tutorials.output_path(source)))
+
+        start = time.perf_counter()
+        page = build_tutorials.render_template(
+            build_tutorials.load_template(settings['template']),
+            build_tutorials.page_context(settings, assets, output, html_body),
+        )
+        timings['template'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        output_bytes = build_tutorials.write_chunks(output, [page])
+        timings['write'] = time.perf_counter() - start
+
+    return {
+        'tutorial': os.path.basename(source),
+        'scale': scale,
+        'backend': backend,
+        'input_bytes': len(md_content.encode('utf-8')),
+        'output_bytes': output_bytes,
+        'stages': timings,
+        'total': sum(timings.values()),
+        'peak_rss': peak_rss(),
+    }
+
+
+def git_revision():
+    """現在のコミット（取得できなければ None）"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=build_tutorials.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sources, scales, backends=('markdown',)):
+    """すべての組み合わせを順番に計測する（同時に動かすと時間がぶれるため）"""
+    context = multiprocessing.get_context('spawn')
+    cases = []
+    for scale in scales:
+        for source in sources:
+            for backend in backends:
+                # 前の計測の読み込み済みモジュールやメモリが残らないように、毎回新しいプロセスで計測する
+                # （max_tasks_per_child=1 と同じだが、Python 3.11 より前でも動く）
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    case = executor.submit(run_case, source, scale, backend).result()
+                print_case(case)
+                cases.append(case)
+    return {
+        'revision': git_revision(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': cases,
+    }
+
+
+def conversion_time(case):
+    """Markdownの変換にかかった時間（parse + highlight + toc）"""
+    return sum(case['stages'][stage] for stage in ('parse', 'highlight', 'toc'))
+
+
+def print_case(case):
+    stages = ' '.join(f"{stage}={case['stages'][stage] * 1000:.0f}ms" for stage in STAGES)
+    throughput = case['input_bytes'] / conversion_time(case) / 1024 / 1024
+    print(f"{case['tutorial']:<40} x{case['scale']:<4} {case.get('backend', 'markdown'):<12}"
+          f"合計 {case['total']:.2f}秒  変換 {throughput:.2f}MB/秒  "
+          f"RSS {case['peak_rss'] / 1024 / 1024:.0f}MB  出力 {case['output_bytes']:,} bytes")
+    print(f"    {stages}")
+
+
+def print_throughput(result):
+    """倍率ごとに、バックエンドごとの変換の速さ（全チュートリアルの合計）を表示する"""
+    backends = list(dict.fromkeys(case.get('backend', 'markdown') for case in result['cases']))
+    if len(backends) < 2:
+        return
+    print(f"\nバックエンドごとの変換の速さ（{backends[0]} との比）:")
+    for scale in dict.fromkeys(case['scale'] for case in result['cases']):
+        speeds = {}
+        for backend in backends:
+            cases = [case for case in result['cases']
+                     if case['scale'] == scale and case.get('backend', 'markdown') == backend]
+            speeds[backend] = (sum(case['input_bytes'] for case in cases) / 1024 / 1024
+                               / sum(conversion_time(case) for case in cases))
+        print(f"x{scale:<4} " + '  '.join(
+            f"{backend} {speed:.2f}MB/秒（{speed / speeds[backends[0]]:.1f}倍）"
+            for backend, speed in speeds.items()
+        ))
+
+
+def compare(result, baseline):
+    """前回の結果と比べて、段階ごとの変化率を表示する"""
+    previous = {(case['tutorial'], case['scale'], case.get('backend', 'markdown')): case
+                for case in baseline['cases']}
+    print(f"\n{baseline.get('revision')} との比較（+は遅くなった）:")
+    for case in result['cases']:
+        old = previous.get((case['tutorial'], case['scale'], case['backend']))
+        if old is None:
+            continue
+        changes = []
+        for stage in STAGES + ['total']:
+            new_time = case['total'] if stage == 'total' else case['stages'][stage]
+            old_time = old['total'] if stage == 'total' else old['stages'][stage]
+            if old_time > 0:
+                changes.append(f"{stage} {(new_time / old_time - 1) * 100:+.0f}%")
+        print(f"{case['tutorial']:<40} x{case['scale']:<4} {case['backend']:<12}"
+              f"{'  '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='チュートリアルのビルド処理のベンチマーク')
+    parser.add_argument('sources', nargs='*',
+                        help='計測するMarkdownファイル（省略時は全チュートリアル）')
+    parser.add_argument('--scales', default='1,10,100',
+                        help='Markdownを水増しする倍率（カンマ区切り）')
+    parser.add_argument('--backends', default='markdown',
+                        help='計測するMarkdownのバックエンド（カンマ区切り、markdown_backends.py を参照）')
+    parser.add_argument('-o', '--output',
+                        help='結果のJSONの保存先（省略時は benchmark_results/<コミット>.json）')
+    parser.add_argument('--compare', help='比較する前回の結果のJSON')
+    args = parser.parse_args()
+
+    sources = args.sources or build_tutorials.discover_sources()
+    scales = [int(scale) for scale in args.scales.split(',')]
+    backends = args.backends.split(',')
+    result = run_benchmark(sources, scales, backends)
+    print_throughput(result)
+
+    output = args.output or os.path.join(RESULT_DIR, f"{result['revision'] or 'result'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n結果を {output} に保存しました。")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+全ページ共通のCSS/JSバンドルを作るスクリプト
+
+tutorial_templates/css/*.css と tutorial_templates/js/*.js を1つずつのファイルにまとめ、
+内容のハッシュ付きのファイル名（assets/tutorial.<hash>.css など）で書き出す。
+ブラウザは1度キャッシュすれば、index.html と全チュートリアルで使い回せる。
+
+ページごとにスタイルが違うので、各CSSは <html class="page-名前"> の中だけに効くようにし、
+各JSも同じクラスのページでだけ動くようにしてからまとめる。
+全ページで使う部品（common.css / common.js の検索ボックスなど）だけはそのまま入れる。
+
+使い方:
+    python build_assets.py
+"""
+
+import glob
+import hashlib
+import importlib.metadata
+import json
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, 'tutorial_templates')
+ASSET_DIR = os.path.join(BASE_DIR, 'assets')
+ASSET_CACHE_FILE = os.path.join(BASE_DIR, '.build_cache', 'assets.json')
+ASSET_NAME = 'tutorial'
+
+# ページを限定せずに全ページに効かせるCSS/JS
+COMMON_NAME = 'common'
+
+# コードブロックのハイライトに使うPygmentsのCSSクラス
+PYGMENTS_CSS_CLASSES = ['codehilite', 'highlight']
+
+# 入力や出力の形式を変えたら上げる（キャッシュが無効になる）
+ASSET_VERSION = 1
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+
+def page_class(name):
+    """ページを区別するために <html> に付けるクラス名"""
+    return 'page-' + name
+
+
+def matching_brace(text, start):
+    """text[start] の { に対応する } の位置を返す"""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == '{':
+            depth += 1
+        elif text[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError('CSSの { } が対応していません')
+
+
+def split_selectors(prelude):
+    """セレクタのリストをカンマで分ける（:not(a, b) などの中のカンマは除く）"""
+    selectors = []
+    depth = 0
+    current = ''
+    for char in prelude:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            selectors.append(current.strip())
+            current = ''
+        else:
+            current += char
+    selectors.append(current.strip())
+    return selectors
+
+
+def scope_selector(selector, scope):
+    """1つのセレクタを scope（.page-名前）の中だけに効くように書き換える"""
+    if selector == 'html' or selector.startswith(('html ', 'html:', 'html.')):
+        return 'html' + scope + selector[4:]
+    if selector.startswith('::'):
+        # スクロールバーなどは <html> 自身にも付ける
+        return f'{scope}{selector}, {scope} {selector}'
+    return f'{scope} {selector}'
+
+
+def scope_css(css, scope):
+    """CSSのすべてのルールを scope の中だけに効くように書き換える"""
+    css = CSS_COMMENT_RE.sub('', css)
+    rules = []
+    pos = 0
+    while True:
+        start = css.find('{', pos)
+        if start == -1:
+            break
+        end = matching_brace(css, start)
+        prelude = css[pos:start].strip()
+        block = css[start + 1:end]
+        if prelude.startswith(('@media', '@supports')):
+            rules.append(f'{prelude} {{{scope_css(block, scope)}}}')
+        elif prelude.startswith('@'):
+            # @keyframes などはそのまま
+            rules.append(f'{prelude} {{{block}}}')
+        else:
+            selectors = ', '.join(scope_selector(s, scope) for s in split_selectors(prelude))
+            rules.append(f'{selectors} {{{block}}}')
+        pos = end + 1
+    return '\n'.join(rules)
+
+
+def minify_css(css):
+    """コメントと余分な空白を取り除く"""
+    css = CSS_COMMENT_RE.sub('', css)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r'([{;]\s*[-\w]+):\s+', r'\1:', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def minify_js(js):
+    """行頭のインデント・空行・行コメントを取り除く"""
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if not line or line.startswith('//'):
+            continue
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def pygments_css(style='monokai'):
+    """Pygmentsのスタイルシートを取得（画面用は monokai スタイル）"""
+    from pygments.formatters import HtmlFormatter
+
+    styles = []
+    for css_class in PYGMENTS_CSS_CLASSES:
+        formatter = HtmlFormatter(style=style, linenos=False, cssclass=css_class)
+        styles.append(formatter.get_style_defs('.' + css_class))
+    return '\n'.join(styles)
+
+
+def source_files():
+    """バンドルの元になるCSS/JSファイル（ページ名 → パス）"""
+    css_files = {
+        os.path.splitext(os.path.basename(path))[0]: path
+        for path in sorted(glob.glob(os.path.join(TEMPLATE_DIR, 'css', '*.css')))
+    }
+    js_files = {
+        os.path.splitext(os.path.basename(path))[0]: path
+        for path in sorted(glob.glob(os.path.join(TEMPLATE_DIR, 'js', '*.js')))
+    }
+    return css_files, js_files
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def bundle_css(css_files):
+    """Pygmentsのスタイル・共通のCSS・各ページのCSSを1つにまとめる"""
+    parts = [pygments_css()]
+    for name, path in css_files.items():
+        if name == COMMON_NAME:
+            parts.append(read(path))
+        else:
+            parts.append(scope_css(read(path), '.' + page_class(name)))
+    return minify_css('\n'.join(parts)) + '\n'
+
+
+def bundle_js(js_files):
+    """各ページのJSを、そのページでだけ動く関数に包んで1つにまとめる"""
+    parts = []
+    for name, path in js_files.items():
+        if name == COMMON_NAME:
+            parts.append(minify_js(read(path)))
+            continue
+        parts.append(
+            '(function () {\n'
+            f"if (!document.documentElement.classList.contains('{page_class(name)}')) return;\n"
+            f'{minify_js(read(path))}\n'
+            '})();'
+        )
+    return '\n'.join(parts) + '\n'
+
+
+def input_key(css_files, js_files):
+    """バンドルの元になるファイルとPygmentsのバージョンから作るハッシュ
+
+    バージョンはインストール情報から読み、変更がなければPygmentsを読み込まずに済ませる。
+    """
+    version = importlib.metadata.version('Pygments')
+    digest = hashlib.sha256(f'{ASSET_VERSION} {version}'.encode('utf-8'))
+    for path in list(css_files.values()) + list(js_files.values()):
+        digest.update(os.path.relpath(path, TEMPLATE_DIR).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def write_fingerprinted(content, extension):
+    """内容のハッシュを付けたファイル名で書き出し、そのパスを返す"""
+    fingerprint = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+    path = os.path.join(ASSET_DIR, f'{ASSET_NAME}.{fingerprint}.{extension}')
+    if not os.path.exists(path):
+        os.makedirs(ASSET_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    return path
+
+
+def remove_stale_assets(keep):
+    """古いハッシュのバンドルを削除する"""
+    for path in glob.glob(os.path.join(ASSET_DIR, f'{ASSET_NAME}.*')):
+        if path not in keep:
+            os.remove(path)
+
+
+def build_assets(force=False):
+    """CSS/JSバンドルを作り、{'css': パス, 'js': パス} を返す
+
+    元のファイルが前回と同じなら、作り直さずに前回のバンドルを返す。
+    """
+    css_files, js_files = source_files()
+    key = input_key(css_files, js_files)
+
+    if not force:
+        try:
+            with open(ASSET_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (FileNotFoundError, ValueError):
+            cached = {}
+        if cached.get('key') == key:
+            assets = {kind: os.path.join(BASE_DIR, path) for kind, path in cached['assets'].items()}
+            if all(os.path.exists(path) for path in assets.values()):
+                return assets
+
+    assets = {
+        'css': write_fingerprinted(bundle_css(css_files), 'css'),
+        'js': write_fingerprinted(bundle_js(js_files), 'js'),
+    }
+    remove_stale_assets(set(assets.values()))
+
+    os.makedirs(os.path.dirname(ASSET_CACHE_FILE), exist_ok=True)
+    with open(ASSET_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'key': key,
+            'assets': {kind: os.path.relpath(path, BASE_DIR) for kind, path in assets.items()},
+        }, f, indent=2)
+    return assets
+
+
+def main():
+    assets = build_assets(force=True)
+    for path in assets.values():
+        print(f"{os.path.relpath(path, BASE_DIR)} を生成しました。（{os.path.getsize(path):,} bytes）")
+
+
+if __name__ == "__main__":
+    main()
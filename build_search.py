@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+チュートリアルの全文検索用のインデックスを作るスクリプト
+
+生成したHTMLから見出し・本文・コード中の識別子を取り出し、見出しごとの区切りを
+1件の文書とした転置インデックスを search/<チュートリアル名>.json に書き出す。
+日本語は2文字ずつ（bigram）、英数字は単語ごとに区切る。
+インデックスはチュートリアルごとに分けてあり、語 → その語を含むチュートリアルの一覧
+（search/terms.json）も作る。検索ボックス（tutorial_templates/js/common.js）は入力が始まってから
+一覧を読み、検索語をすべて含むチュートリアルのインデックスだけを読み込むので、サーバーなしで検索できる。
+
+通常は build_tutorials.py がビルドのたびに更新する。
+
+使い方:
+    python build_search.py                    # 生成済みの全チュートリアルのインデックスを作る
+    python build_search.py NumPy_Tutorial_Complete.html
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from html.parser import HTMLParser
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEARCH_DIR = os.path.join(BASE_DIR, 'search')
+MANIFEST_FILE = os.path.join(SEARCH_DIR, 'index.json')
+TERMS_FILE = os.path.join(SEARCH_DIR, 'terms.json')
+CHUNK_SIZE = 64 * 1024
+
+# 形式を変えたら上げる（検索ボックスのスクリプトも合わせて直す）
+SEARCH_VERSION = 2
+
+# 文書の区切りにする見出し（これより深い見出しは親の文書に含める）
+DOCUMENT_HEADINGS = {'h1', 'h2', 'h3'}
+
+# 見出しに含まれる語は本文の何回分として数えるか（見出しに一致するものを上位にする）
+TITLE_WEIGHT = 10
+
+# 本文として扱わない要素
+SKIP_TAGS = {'script', 'style', 'nav', 'header'}
+SKIP_CLASSES = {'nav', 'footer'}
+
+# 検索ボックスと同じ規則で区切る（common.js の TOKEN_RE と合わせる）
+TOKEN_RE = re.compile(r'[a-z0-9_]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+')
+ASCII_RE = re.compile(r'[a-z0-9_]')
+
+
+def tokenize(text):
+    """検索語に分ける（英数字は単語、日本語は2文字ずつ）"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    tokens = []
+    for word in TOKEN_RE.findall(text):
+        if ASCII_RE.match(word):
+            # 1文字の英数字（x や i など）は多すぎて役に立たない
+            if len(word) > 1:
+                tokens.append(word)
+        elif len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def code_tokens(code):
+    """コードからは識別子（英数字）だけを取り出す"""
+    return [token for token in tokenize(code) if ASCII_RE.match(token)]
+
+
+class DocumentExtractor(HTMLParser):
+    """HTMLを見出しごとの文書（id・見出し・語の出現回数）に分ける"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.documents = []
+        self.heading = None
+        self.heading_id = None
+        self.heading_text = []
+        # ナビゲーションやフッターなど、本文でない要素の中にいる間は読み飛ばす
+        self.skip_tag = None
+        self.skip_depth = 0
+        self.code_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.skip_tag:
+            if tag == self.skip_tag:
+                self.skip_depth += 1
+        elif tag in SKIP_TAGS or (tag == 'div' and attrs.get('class') in SKIP_CLASSES):
+            self.skip_tag = tag
+            self.skip_depth = 1
+        elif tag in ('pre', 'code'):
+            self.code_depth += 1
+        elif tag in DOCUMENT_HEADINGS and attrs.get('id'):
+            self.heading = tag
+            self.heading_id = attrs['id']
+            self.heading_text = []
+
+    def handle_endtag(self, tag):
+        if self.skip_tag:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if not self.skip_depth:
+                    self.skip_tag = None
+        elif tag in ('pre', 'code') and self.code_depth:
+            self.code_depth -= 1
+        elif tag == self.heading:
+            title = ' '.join(''.join(self.heading_text).split())
+            self.documents.append({'id': self.heading_id, 'title': title, 'terms': {}})
+            self.add_tokens(tokenize(title), TITLE_WEIGHT)
+            self.heading = None
+
+    def handle_data(self, data):
+        if self.skip_tag:
+            return
+        if self.heading:
+            self.heading_text.append(data)
+        elif self.documents:
+            self.add_tokens(code_tokens(data) if self.code_depth else tokenize(data))
+
+    def add_tokens(self, tokens, weight=1):
+        terms = self.documents[-1]['terms']
+        for token in tokens:
+            terms[token] = terms.get(token, 0) + weight
+
+
+def extract_documents(path):
+    """HTMLファイルを少しずつ読みながら見出しごとの文書に分ける"""
+    parser = DocumentExtractor()
+    with open(path, 'r', encoding='utf-8') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            parser.feed(chunk)
+    parser.close()
+    return parser.documents
+
+
+def build_shard(documents):
+    """文書のリストから転置インデックスを作る
+
+    terms は 語 → [文書番号, 出現回数, 文書番号, 出現回数, ...] の平らなリスト
+    （見出しの語は TITLE_WEIGHT 回として数える）。
+    """
+    postings = {}
+    for number, document in enumerate(documents):
+        for term, count in document['terms'].items():
+            postings.setdefault(term, []).extend([number, count])
+    return {
+        'version': SEARCH_VERSION,
+        'docs': [[document['id'], document['title']] for document in documents],
+        'terms': dict(sorted(postings.items())),
+    }
+
+
+def shard_path(page):
+    """HTMLファイルに対応するインデックスのパス"""
+    name = os.path.splitext(os.path.basename(page))[0]
+    return os.path.join(SEARCH_DIR, name + '.json')
+
+
+def write_json(path, data):
+    """内容が変わったときだけ書き出し、書き出したかどうかを返す"""
+    content = json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n'
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_file, path)
+    return True
+
+
+def build_search_index(page):
+    """1つのHTMLページのインデックスを書き出し、そのパスを返す"""
+    path = shard_path(page)
+    write_json(path, build_shard(extract_documents(page)))
+    return path
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def build_term_directory(shards):
+    """語 → その語を含むチュートリアル（shards の中の番号のリスト）の辞書を作る
+
+    検索ボックスはこれを見て、検索語をすべて含むチュートリアルのインデックスだけを読み込む。
+    """
+    directory = {}
+    for number, shard in enumerate(shards):
+        with open(shard, 'r', encoding='utf-8') as f:
+            terms = json.load(f)['terms']
+        for term in terms:
+            directory.setdefault(term, []).append(number)
+    return {'version': SEARCH_VERSION, 'terms': dict(sorted(directory.items()))}
+
+
+def build_manifest(pages):
+    """検索ボックスが最初に読む一覧（search/index.json）と、語の一覧（search/terms.json）を書き出す
+
+    pages は (HTMLファイル, チュートリアルのタイトル) のリスト。
+    インデックスと語の一覧のURLに内容のハッシュを付け、更新されたものだけを読み直させる。
+    書き出したかどうかを返す。
+    """
+    tutorials = []
+    shards = []
+    for page, title in pages:
+        shard = shard_path(page)
+        if not os.path.exists(shard):
+            continue
+        shards.append(shard)
+        tutorials.append({
+            'title': title,
+            'href': os.path.relpath(page, BASE_DIR).replace(os.sep, '/'),
+            'shard': f'{os.path.basename(shard)}?v={file_hash(shard)}',
+        })
+    write_json(TERMS_FILE, build_term_directory(shards))
+    changed = write_json(MANIFEST_FILE, {
+        'version': SEARCH_VERSION,
+        'terms': f'{os.path.basename(TERMS_FILE)}?v={file_hash(TERMS_FILE)}',
+        'tutorials': tutorials,
+    })
+    remove_stale_shards([shard_path(page) for page, _ in pages])
+    return changed
+
+
+def remove_stale_shards(keep):
+    """チュートリアルがなくなったインデックスを削除する"""
+    for path in glob.glob(os.path.join(SEARCH_DIR, '*.json')):
+        if path not in (MANIFEST_FILE, TERMS_FILE) and path not in keep:
+            os.remove(path)
+
+
+def main():
+    import build_tutorials
+
+    parser = argparse.ArgumentParser(description='チュートリアルの全文検索用のインデックスを作る')
+    parser.add_argument('pages', nargs='*',
+                        help='インデックスを作るHTMLファイル（省略時は生成済みの全チュートリアル）')
+    args = parser.parse_args()
+
+    sources = build_tutorials.discover_sources()
+    pages = args.pages or [build_tutorials.output_path(source) for source in sources]
+    for page in pages:
+        path = build_search_index(page)
+        print(f"{os.path.relpath(path, BASE_DIR)} を生成しました。（{os.path.getsize(path):,} bytes）")
+
+    build_manifest([
+        (build_tutorials.output_path(source), build_tutorials.tutorial_settings(source)['title'])
+        for source in sources
+        if os.path.exists(build_tutorials.output_path(source))
+    ])
+
+
+if __name__ == "__main__":
+    main()
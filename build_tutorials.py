@@ -0,0 +1,1180 @@
+#!/usr/bin/env python3
+"""
+全チュートリアルのMarkdownをまとめてHTMLに変換するビルドスクリプト
+
+tutorials.toml に書かれたチュートリアルを、プロセスプールで並列に変換する。
+各チュートリアルのMarkdown・出力先・タイトル・テンプレートと、テンプレートごとの
+Markdown拡張機能の設定もすべて tutorials.toml に書く。
+
+使い方:
+    python build_tutorials.py                 # 全チュートリアルをビルド
+    python build_tutorials.py NumPy_Tutorial_Complete.md
+    python build_tutorials.py -j 4            # ワーカー数を指定
+    python build_tutorials.py --force         # キャッシュを無視して全て再ビルド
+    python build_tutorials.py --watch         # 保存するたびに変更されたものだけ再ビルド
+    python build_tutorials.py --no-compress   # .gz / .br を作らない
+    python build_tutorials.py --split         # 章ごとに分けたページ（<名前>/）も作る
+    python build_tutorials.py --check-code    # ビルド後にPythonのコードブロックを実行して確認
+    python build_tutorials.py --check-links   # ビルド後にサイト全体のリンク切れを確認
+    python build_tutorials.py --examples      # examples/*.py の実行結果を該当する節に埋め込む
+    python build_tutorials.py --backend markdown-it   # 速いCommonMarkのパーサーで変換する
+
+変更のないチュートリアルは .build_cache/ のハッシュを見てスキップする。
+"""
+
+import argparse
+import filecmp
+import functools
+import glob
+import hashlib
+import importlib.metadata
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from build_assets import build_assets
+from build_search import build_manifest, build_search_index, shard_path
+from markdown_backends import BACKENDS, DEFAULT_BACKEND, create_converter, extension_name
+from precompress import file_hash, precompress
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, 'tutorial_templates')
+CACHE_DIR = os.path.join(BASE_DIR, '.build_cache')
+CACHE_FILE = os.path.join(CACHE_DIR, 'manifest.json')
+SECTION_CACHE_DIR = os.path.join(CACHE_DIR, 'sections')
+HIGHLIGHT_CACHE_DIR = os.path.join(CACHE_DIR, 'highlight')
+MANIFEST_FILE = os.path.join(BASE_DIR, 'tutorials.toml')
+
+# 変換処理やテンプレートの仕組みを変えたら上げる（キャッシュが無効になる）
+BUILD_VERSION = 1
+
+
+class BuildError(Exception):
+    """ビルドの失敗（ライブラリとして使うときは、これを捕まえればよい）"""
+
+
+class ManifestError(BuildError, ValueError):
+    """tutorials.toml を読めない・内容が正しくない"""
+
+
+class SourceNotFoundError(BuildError, FileNotFoundError):
+    """ビルドするMarkdownファイルがない"""
+
+
+class TutorialBuildError(BuildError):
+    """1つのチュートリアルの変換に失敗した（source に対象のMarkdown、__cause__ に元の例外）"""
+
+    def __init__(self, source, error):
+        super().__init__(f"{os.path.basename(source)}: {type(error).__name__}: {error}")
+        self.source = source
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """tutorials.toml を読み込み、(テンプレートの設定, Markdownファイル名 → チュートリアルの設定) を返す"""
+    if tomllib is None:
+        raise ManifestError(f"{os.path.basename(path)} を読むには Python 3.11 以上か tomli が必要です（pip install tomli）")
+    with open(path, 'rb') as f:
+        try:
+            manifest = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ManifestError(f"{os.path.basename(path)}: {e}") from e
+
+    templates = manifest.get('templates', {})
+    for name, template in templates.items():
+        if template.get('backend', DEFAULT_BACKEND) not in BACKENDS:
+            raise ManifestError(f"{os.path.basename(path)}: テンプレート {name} の backend が不明です: "
+                                f"{template['backend']}（{', '.join(BACKENDS)} のどれか）")
+    tutorials = {}
+    for entry in manifest.get('tutorials', []):
+        for key in ('source', 'template', 'title'):
+            if key not in entry:
+                raise ManifestError(f"{os.path.basename(path)}: [[tutorials]] に {key} がありません: {entry}")
+        if entry['template'] not in templates:
+            raise ManifestError(f"{os.path.basename(path)}: テンプレート {entry['template']} の設定がありません")
+        settings = {
+            'template': entry['template'],
+            'title': entry['title'],
+            'footer': entry.get('footer', entry['title']),
+            'extra_nav': [tuple(link) for link in entry.get('extra_nav', [])],
+        }
+        if 'output' in entry:
+            settings['output'] = entry['output']
+        tutorials[entry['source']] = settings
+    return templates, tutorials
+
+
+def reload_manifest():
+    """tutorials.toml を読み直す（監視モードで、編集されたときに使う）"""
+    templates, tutorials = load_manifest()
+    TEMPLATES.clear()
+    TEMPLATES.update(templates)
+    TUTORIALS.clear()
+    TUTORIALS.update(tutorials)
+    get_converter.cache_clear()
+
+
+# テンプレートごとのMarkdown拡張機能とPygmentsの設定・チュートリアルごとの設定
+TEMPLATES, TUTORIALS = load_manifest()
+
+PLACEHOLDER_RE = re.compile(r'\{\{ (\w+) \}\}')
+
+# セクション分割用（トップレベルの見出しとコードフェンス）
+SECTION_HEADING_RE = re.compile(r'^#{1,2} ')
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+# 脚注・参照リンク・略語の定義はドキュメント全体に効くので、あればセクション分割しない
+GLOBAL_DEFINITION_RE = re.compile(r'^ {0,3}(\[[^\]]+\]:|\*\[[^\]]+\]:)', re.MULTILINE)
+# Markdownの画像と参照リンクの定義が指すファイル（asset_store が置き場に入れるもの）
+MARKDOWN_IMAGE_RE = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)|^ {0,3}\[[^\]]+\]:\s*<?([^\s>]+)', re.MULTILINE)
+# toc拡張機能の目次の目印（extension_configs の marker で変えられる）
+DEFAULT_TOC_MARKER = '[TOC]'
+# 変換後のHTMLの見出しタグと、toc拡張機能の anchorlink
+HEADING_TAG_RE = re.compile(
+    r'(<h[1-6]\b[^>]*? id=")[^"]*("[^>]*>)(?:(<a class="toclink" href="#)[^"]*)?'
+)
+# セクションの末尾に付ける目印の段落（変換後にここで切り取る）
+SECTION_END_MARK = 'SECTIONENDc4a1e7'
+# ページ内リンク（章ごとのページに分けるときに、他のページへのリンクに書き換える）
+FRAGMENT_LINK_RE = re.compile(r'href="#([^"]+)"')
+# 画像などの共通アセットへのリンク（章ごとのページでは1つ上の階層を指すように書き換える）
+ASSET_LINK_RE = re.compile(r'\b(src|srcset)="assets/')
+
+
+def discover_sources(base_dir=BASE_DIR):
+    """ビルド対象のMarkdownファイル（tutorials.toml に書かれたもの）"""
+    return sorted(os.path.join(base_dir, name) for name in TUTORIALS)
+
+
+def tutorial_settings(source, backend=None):
+    """Markdownファイルに対応する設定を返す（tutorials.toml になければlibraryテンプレート）
+
+    backend を指定すると、テンプレートの設定より優先してそのMarkdownのバックエンドを使う。
+    """
+    name = os.path.basename(source)
+    if name in TUTORIALS:
+        settings = TUTORIALS[name]
+    else:
+        title = name[:-len('_Tutorial_Complete.md')] + '完全チュートリアル'
+        settings = {
+            'template': 'library',
+            'title': title,
+            'footer': title,
+            'extra_nav': [],
+        }
+    if backend:
+        settings = dict(settings, backend=backend)
+    return settings
+
+
+def markdown_backend(settings):
+    """チュートリアルの変換に使うMarkdownのバックエンド名"""
+    return settings.get('backend') or TEMPLATES[settings['template']].get('backend', DEFAULT_BACKEND)
+
+
+def load_template(name):
+    """tutorial_templates/ からHTMLテンプレートを読み込む"""
+    path = os.path.join(TEMPLATE_DIR, name + '.html')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def iter_template(template, context):
+    """テンプレートの {{ name }} を context の値で置き換えながら、先頭から順に返す
+
+    値が文字列でなければ（ジェネレーターなど）、その中身を順に流す。
+    """
+    parts = PLACEHOLDER_RE.split(template)
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            if part:
+                yield part
+            continue
+        value = context[part]
+        if isinstance(value, str):
+            yield value
+        else:
+            yield from value
+
+
+def render_template(template, context):
+    """テンプレートの {{ name }} を context の値で置き換える"""
+    return ''.join(iter_template(template, context))
+
+
+def installed_version(distribution):
+    """インストールされているパッケージのバージョン（なければ None。パッケージ自体は読み込まない）"""
+    try:
+        return importlib.metadata.version(distribution)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def library_versions(backend):
+    """変換結果に影響するライブラリ（Python-Markdown・Pygments・バックエンド）のバージョン
+
+    インストール情報から読むので、変更のないビルドでもライブラリ自体は読み込まない。
+    """
+    distributions = ['Markdown', 'Pygments']
+    if backend in BACKENDS:
+        distributions += BACKENDS[backend][0].distributions
+    versions = {name.lower(): installed_version(name) for name in distributions}
+    # Pillow があるかどうかで、画像に WebP/AVIF の版（<picture>）が付くかが変わる
+    versions['pillow'] = installed_version('Pillow')
+    return versions
+
+
+def referenced_images(md_content):
+    """Markdownの画像が参照するローカルのファイル（asset_store と同じく、サイトのトップからのパス）"""
+    paths = set()
+    for match in MARKDOWN_IMAGE_RE.finditer(md_content):
+        src = match.group(1) or match.group(2)
+        if '://' in src or src.startswith(('/', 'data:')):
+            continue
+        path = os.path.join(BASE_DIR, src)
+        if os.path.isfile(path):
+            paths.add(path)
+    return sorted(paths)
+
+
+def images_key(md_content):
+    """参照する画像の (パス, 内容のハッシュ) のリスト（画像だけを差し替えても変換し直すため）"""
+    return [[os.path.relpath(path, BASE_DIR), file_hash(path)] for path in referenced_images(md_content)]
+
+
+def markdown_options(settings):
+    """Markdownの変換結果に影響する設定をまとめる"""
+    template_settings = TEMPLATES[settings['template']]
+    backend = markdown_backend(settings)
+    return {
+        'build_version': BUILD_VERSION,
+        'backend': backend,
+        'libraries': library_versions(backend),
+        'extensions': template_settings['extensions'],
+        'extension_configs': template_settings['extension_configs'],
+    }
+
+
+def build_key(source, settings, assets, split=False, examples_key=None):
+    """ソース・拡張機能の設定・テンプレート・共通アセットから変換結果を識別するハッシュを作る"""
+    options = {
+        'markdown': markdown_options(settings),
+        'settings': settings,
+        'assets': {kind: os.path.basename(path) for kind, path in assets.items()},
+        'split': split,
+        'examples': examples_key,
+    }
+
+    with open(source, 'rb') as f:
+        content = f.read()
+    options['images'] = images_key(content.decode('utf-8'))
+
+    digest = hashlib.sha256(content)
+    digest.update(json.dumps(options, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    digest.update(load_template(settings['template']).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_cache():
+    """前回のビルド結果（ソースごとのハッシュ）を読み込む"""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    """ビルド結果を書き出す（途中で止まっても壊れないように置き換えで保存）"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_file = CACHE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_file, CACHE_FILE)
+
+
+def cache_entry_name(source):
+    """キャッシュのキーにするソースのパス（BASE_DIRからの相対パス）"""
+    return os.path.relpath(os.path.abspath(source), BASE_DIR)
+
+
+def output_path(source):
+    """Markdownファイルに対応するHTMLファイルのパス（tutorials.toml の output があればそれ）"""
+    output = tutorial_settings(source).get('output')
+    if output:
+        return os.path.join(os.path.dirname(os.path.abspath(source)), output)
+    return os.path.splitext(source)[0] + '.html'
+
+
+def split_output_dir(source):
+    """章ごとに分けたページを書き出すディレクトリ"""
+    return os.path.splitext(output_path(source))[0]
+
+
+def split_sections(md_content):
+    """Markdownをトップレベルの見出し（# と ##）の位置で分割する
+
+    コードブロック内の # で始まる行（Pythonのコメントなど）では分割しない。
+    """
+    sections = []
+    current = []
+    fence = None
+    for line in md_content.splitlines(keepends=True):
+        match = FENCE_RE.match(line)
+        if fence is None:
+            if match:
+                fence = match.group(1)
+            elif SECTION_HEADING_RE.match(line) and current:
+                sections.append(''.join(current))
+                current = []
+        elif match and line.strip() == match.group(1) and match.group(1).startswith(fence):
+            fence = None
+        current.append(line)
+    if current:
+        sections.append(''.join(current))
+    return sections
+
+
+def render_section(converter, section):
+    """1セクションを変換し、(HTML断片, 見出しの情報) を返す
+
+    見出しのidを後から振り直せない場合（生のHTMLで書かれた見出しなど）は、
+    見出しの情報として None を返す。
+    """
+    # convert() は末尾の空白を削ってしまうので、目印の段落を足して変換し
+    # 目印の直前までを使う（文書全体を変換したときと同じ区切りになる）
+    output = converter.convert(section.rstrip('\n') + '\n\n' + SECTION_END_MARK + '\n')
+    fragment = output[:output.rindex('<p>' + SECTION_END_MARK + '</p>')]
+
+    # toc拡張機能が自動で付けたidか、{#id} で明示されたidかは headings() の slug でわかる
+    headings = converter.headings()
+    if len(HEADING_TAG_RE.findall(fragment)) != len(headings):
+        return fragment, None
+    return fragment, headings
+
+
+def assign_heading_ids(sections):
+    """セクションごとの見出しに、文書全体で一意なidを振り直す
+
+    toc拡張機能は重複したidに _1, _2 ... を付けるので、文書全体を一度に
+    変換した場合と同じidになるように順番に振り直し、セクションごとのidのリストを返す。
+    """
+    from markdown.extensions.toc import unique
+
+    used_ids = {
+        heading['id']
+        for headings in sections
+        for heading in headings
+        if heading['slug'] is None
+    }
+
+    section_ids = []
+    for headings in sections:
+        final_ids = []
+        for heading in headings:
+            if heading['slug'] is None:
+                final_ids.append(heading['id'])
+            else:
+                final_ids.append(unique(heading['slug'], used_ids))
+        section_ids.append(final_ids)
+    return section_ids
+
+
+def toc_marker_re(settings):
+    """本文に置いた目次の目印の段落に一致する正規表現（目印がなければ None）"""
+    template_settings = TEMPLATES[settings['template']]
+    if not any(extension_name(extension) == 'toc' for extension in template_settings['extensions']):
+        return None
+    configs = {extension_name(name): config
+               for name, config in template_settings['extension_configs'].items()}
+    marker = configs.get('toc', {}).get('marker', DEFAULT_TOC_MARKER)
+    if not marker:
+        return None
+    return re.compile(r'^ {0,3}' + re.escape(marker) + r'[ \t]*$', re.MULTILINE)
+
+
+def renumber_headings(fragment, final_ids):
+    """HTML断片の見出しidと anchorlink を final_ids の順に書き換える"""
+    ids = iter(final_ids)
+
+    def replace_id(match):
+        final_id = next(ids)
+        anchor = match.group(3)
+        return match.group(1) + final_id + match.group(2) + (anchor + final_id if anchor else '')
+
+    return HEADING_TAG_RE.sub(replace_id, fragment)
+
+
+def strip_chunks(chunks):
+    """つないだ結果の前後の空白を取り除く（md.convert() の結果と揃える）"""
+    pending = ''
+    started = False
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        body = chunk.rstrip()
+        if body:
+            yield pending + body
+            pending = chunk[len(body):]
+        else:
+            pending += chunk
+
+
+def section_key(options_json, section):
+    """セクションのキャッシュキー（変換設定・セクション本文・参照する画像の内容のハッシュ）"""
+    digest = hashlib.sha256(options_json.encode('utf-8'))
+    digest.update(section.encode('utf-8'))
+    digest.update(json.dumps(images_key(section)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_section_index(directory):
+    """セクションのキャッシュの index.json を読み込む（なければ空）"""
+    try:
+        with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        index = {}
+    return {'sections': index.get('sections', {}), 'highlights': index.get('highlights', [])}
+
+
+class SectionCache:
+    """セクションごとのHTML断片をファイルに保存するキャッシュ
+
+    断片は .build_cache/sections/<チュートリアル名>/<ハッシュ>.html に1つずつ置き、
+    見出しの情報と、使ったハイライトのキャッシュキーだけを index.json にまとめる。
+    ページを書き出すときは断片を1つずつ読むので、メモリに載るのは一番大きなセクションの分だけで済む。
+    """
+
+    def __init__(self, source, reset=False):
+        name = os.path.splitext(os.path.basename(source))[0]
+        self.directory = os.path.join(SECTION_CACHE_DIR, name)
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self.entries = {} if reset else load_section_index(self.directory)['sections']
+        self.used = {}
+        # このチュートリアルが参照するハイライトのキャッシュキー（prune_build_cache() が残す）
+        self.highlights = set()
+        self.converted = 0
+
+    def fragment_path(self, key):
+        return os.path.join(self.directory, key + '.html')
+
+    def __contains__(self, key):
+        return key in self.entries and os.path.exists(self.fragment_path(key))
+
+    def store(self, key, fragment, headings, highlights=()):
+        """変換したセクションを保存する（highlights は変換中に使ったハイライトのキャッシュキー）"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.fragment_path(key), 'w', encoding='utf-8') as f:
+            f.write(fragment)
+        self.entries[key] = {'headings': headings, 'highlights': sorted(highlights)}
+        self.converted += 1
+
+    def headings(self, key):
+        """セクションの見出しの情報（このビルドで使ったものとして記録する）"""
+        entry = self.used[key] = self.entries[key]
+        self.highlights.update(entry['highlights'])
+        return entry['headings']
+
+    def read(self, key):
+        """セクションのHTML断片を読み込む"""
+        with open(self.fragment_path(key), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def save(self):
+        """今回使ったセクションだけを残し、古い断片は削除する"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_file = self.index_path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'sections': self.used, 'highlights': sorted(self.highlights)}, f,
+                      ensure_ascii=False)
+        os.replace(tmp_file, self.index_path)
+
+        for filename in os.listdir(self.directory):
+            key, extension = os.path.splitext(filename)
+            if extension == '.html' and key not in self.used:
+                os.remove(os.path.join(self.directory, filename))
+
+
+def highlight_key(code, shebang):
+    """コードブロックのハイライト結果を識別するハッシュ
+
+    言語・コード・スタイル・CSSクラスなど、Pygmentsに渡す設定をすべて含める。
+    """
+    import pygments
+
+    formatter = code.pygments_formatter
+    if not isinstance(formatter, str):
+        formatter = f'{formatter.__module__}.{formatter.__qualname__}'
+    key = json.dumps([
+        pygments.__version__,
+        code.lang,
+        code.src.strip('\n'),
+        code.guess_lang,
+        code.use_pygments,
+        code.lang_prefix,
+        formatter,
+        shebang,
+        sorted((name, repr(value)) for name, value in code.options.items()),
+    ], ensure_ascii=False)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+# このプロセスで参照したハイライトのキャッシュキー（take_highlight_keys() で取り出す）
+_highlight_keys = set()
+
+
+def take_highlight_keys():
+    """前回取り出してから参照したハイライトのキャッシュキーを返し、記録を空にする"""
+    keys = set(_highlight_keys)
+    _highlight_keys.clear()
+    return keys
+
+
+def enable_highlight_cache(use_existing=True):
+    """codehilite のハイライト処理に、ディスクに保存するキャッシュをかぶせる
+
+    同じコードブロック（他のチュートリアルと共通のものや、前回のビルドから
+    変わっていないもの）はPygmentsで字句解析し直さずに結果を再利用する。
+    """
+    from markdown.extensions.codehilite import CodeHilite
+
+    hilite = getattr(CodeHilite.hilite, '__wrapped__', CodeHilite.hilite)
+
+    @functools.wraps(hilite)
+    def cached_hilite(self, shebang=True):
+        key = highlight_key(self, shebang)
+        _highlight_keys.add(key)
+        path = os.path.join(HIGHLIGHT_CACHE_DIR, key[:2], key + '.html')
+        if use_existing:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except FileNotFoundError:
+                pass
+
+        result = hilite(self, shebang)
+
+        # 複数のワーカーが同時に書いても壊れないように置き換えで保存
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(result)
+        os.replace(tmp_file, path)
+        return result
+
+    CodeHilite.hilite = cached_hilite
+
+
+@functools.lru_cache(maxsize=None)
+def get_converter(template, backend=DEFAULT_BACKEND):
+    """テンプレートとバックエンドごとのMarkdownの変換器を作る（プロセス内で使い回す）
+
+    拡張機能の読み込みは重いので、監視モードなどで何度も変換するときは
+    同じ変換器を再利用する（変換のたびに状態はリセットされる）。
+    重いライブラリは、変換器を作るときに初めて読み込まれる。
+    """
+    template_settings = TEMPLATES[template]
+    return create_converter(
+        backend,
+        template_settings['extensions'],
+        template_settings['extension_configs'],
+    )
+
+
+def iter_markdown_html(md_content, settings, section_cache=None):
+    """MarkdownをHTML本文に変換し、断片を文書の順に返すジェネレーター
+
+    section_cache（SectionCache）を渡すと、変更のないセクションは変換せずに
+    保存済みの断片を使う。
+    """
+    prepared = None
+    if section_cache is not None:
+        prepared = prepare_sections(md_content, settings, section_cache)
+
+    if prepared is None:
+        take_highlight_keys()
+        html_body = get_converter(settings['template'], markdown_backend(settings)).convert(md_content)
+        if section_cache is not None:
+            section_cache.highlights.update(take_highlight_keys())
+        yield html_body
+        return
+
+    yield from strip_chunks(
+        renumber_headings(section_cache.read(key), final_ids)
+        for key, _, final_ids in prepared
+    )
+
+
+def prepare_sections(md_content, settings, section_cache):
+    """セクションを変換（変更がなければキャッシュを使用）し、見出しのidを振り直す
+
+    セクションごとに (キャッシュキー, 見出しの情報, 振り直したidのリスト) を返す。
+    脚注など文書全体に効く記法や、全セクションの見出しを並べる目次（[TOC]）があり、
+    セクションに分けて扱えない場合は None を返す。
+    """
+    if GLOBAL_DEFINITION_RE.search(md_content):
+        return None
+    marker_re = toc_marker_re(settings)
+    if marker_re and marker_re.search(md_content):
+        return None
+
+    converter = get_converter(settings['template'], markdown_backend(settings))
+    options_json = json.dumps(markdown_options(settings), sort_keys=True, ensure_ascii=False)
+    keys = []
+    for section in split_sections(md_content):
+        key = section_key(options_json, section)
+        if key not in section_cache:
+            take_highlight_keys()
+            fragment, headings = render_section(converter, section)
+            section_cache.store(key, fragment, headings, take_highlight_keys())
+        keys.append(key)
+
+    sections = [section_cache.headings(key) for key in keys]
+    if any(headings is None for headings in sections):
+        return None
+
+    section_ids = assign_heading_ids(sections)
+    return list(zip(keys, sections, section_ids))
+
+
+def render_markdown(md_content, settings, section_cache=None):
+    """MarkdownをHTML本文に変換する"""
+    return ''.join(iter_markdown_html(md_content, settings, section_cache))
+
+
+def asset_hrefs(assets, output):
+    """出力するHTMLから共通CSS/JSへの相対リンク"""
+    output_dir = os.path.dirname(os.path.abspath(output))
+    return {
+        kind + '_href': os.path.relpath(path, output_dir).replace(os.sep, '/')
+        for kind, path in assets.items()
+    }
+
+
+def page_context(settings, assets, output, body, title=None, root=''):
+    """チュートリアルのテンプレートに渡す値
+
+    root は出力先からサイトのトップへの相対パス（章ごとのページでは '../'）。
+    """
+    extra_nav = ''.join(
+        f'\n        <a href="{root}{href}">{label}</a>'
+        for href, label in settings.get('extra_nav', [])
+    )
+    return {
+        'title': title or settings['title'],
+        'footer': settings['footer'],
+        'extra_nav': extra_nav,
+        'root': root,
+        'body': body,
+        **asset_hrefs(assets, output),
+    }
+
+
+def iter_tutorial_html(md_content, settings, assets, output, section_cache=None):
+    """チュートリアルのHTMLページを、テンプレートと本文の断片の順に返すジェネレーター"""
+    # 本文は変更のないセクションはキャッシュを使い、断片ごとに流す
+    body = iter_markdown_html(md_content, settings, section_cache)
+    return iter_template(
+        load_template(settings['template']),
+        page_context(settings, assets, output, body),
+    )
+
+
+def page_nav(prev_page, next_page):
+    """章ごとのページの前後へのナビゲーション（prev_page / next_page は (ファイル名, 見出し) か None）"""
+    links = []
+    if prev_page:
+        links.append(f'<a class="page-nav-prev" href="{prev_page[0]}">← {prev_page[1]}</a>')
+    links.append('<a class="page-nav-index" href="index.html">目次</a>')
+    if next_page:
+        links.append(f'<a class="page-nav-next" href="{next_page[0]}">{next_page[1]} →</a>')
+    return '<nav class="page-nav">\n' + '\n'.join(links) + '\n</nav>\n'
+
+
+def link_other_pages(fragment, page, id_pages):
+    """他のページにある見出しへのページ内リンクを、そのページへのリンクに書き換える"""
+    def replace_link(match):
+        target_page = id_pages.get(match.group(1))
+        if target_page is None or target_page == page:
+            return match.group(0)
+        return f'href="{target_page}#{match.group(1)}"'
+
+    return FRAGMENT_LINK_RE.sub(replace_link, fragment)
+
+
+def write_split_pages(md_content, settings, assets, source, section_cache):
+    """章（## の見出し）ごとに1ページずつと、その一覧のページを書き出す
+
+    見出しのidは1ページ版と同じなので、ページ内リンクもそのまま使える。
+    書き出したファイルのリストを返す。
+    """
+    out_dir = split_output_dir(source)
+    os.makedirs(out_dir, exist_ok=True)
+    template = load_template(settings['template'])
+    index_output = os.path.join(out_dir, 'index.html')
+
+    prepared = prepare_sections(md_content, settings, section_cache)
+    if prepared is None:
+        # セクションに分けて扱えない文書は、一覧のページに全体を書き出す
+        body = iter_markdown_html(md_content, settings)
+        write_chunks(index_output, iter_template(
+            template, page_context(settings, assets, index_output, body, root='../')
+        ))
+        remove_stale_pages(out_dir, [index_output])
+        return [index_output]
+
+    # 最初のセクションが # の見出し（表題）なら一覧のページに載せる
+    first_headings = prepared[0][1]
+    if not first_headings or first_headings[0]['level'] == 1:
+        intro, chapters = [prepared[0]], prepared[1:]
+    else:
+        intro, chapters = [], prepared
+
+    pages = [(f'section-{number:02d}.html', chapter) for number, chapter in enumerate(chapters, 1)]
+    titles = {
+        name: headings[0]['name'] if headings else name
+        for name, (_, headings, _) in pages
+    }
+    id_pages = {}
+    for name, (_, _, final_ids) in [('index.html', section) for section in intro] + pages:
+        for final_id in final_ids:
+            id_pages.setdefault(final_id, name)
+
+    def fragment(page, key, final_ids):
+        html = renumber_headings(section_cache.read(key), final_ids)
+        # 例の図など、サイトのトップからの相対パスで書かれた画像
+        html = ASSET_LINK_RE.sub(r'\1="../assets/', html)
+        return link_other_pages(html, page, id_pages)
+
+    def index_body():
+        for key, _, final_ids in intro:
+            yield fragment('index.html', key, final_ids)
+        yield '\n<ul class="page-index-list">\n'
+        for name, _ in pages:
+            yield f'<li><a href="{name}">{titles[name]}</a></li>\n'
+        yield '</ul>'
+
+    written = []
+    write_chunks(index_output, iter_template(
+        template, page_context(settings, assets, index_output, index_body(), root='../')
+    ))
+    written.append(index_output)
+
+    for number, (name, (key, _, final_ids)) in enumerate(pages):
+        prev_page = pages[number - 1][0] if number > 0 else None
+        next_page = pages[number + 1][0] if number + 1 < len(pages) else None
+        nav = page_nav(
+            prev_page and (prev_page, titles[prev_page]),
+            next_page and (next_page, titles[next_page]),
+        )
+        output = os.path.join(out_dir, name)
+        body = [nav, fragment(name, key, final_ids).strip(), '\n' + nav]
+        write_chunks(output, iter_template(template, page_context(
+            settings, assets, output, body,
+            title=f"{titles[name]} - {settings['title']}", root='../',
+        )))
+        written.append(output)
+
+    remove_stale_pages(out_dir, written)
+    return written
+
+
+def remove_stale_pages(out_dir, keep):
+    """章が減ったときに前回の章のページが残らないようにする"""
+    for path in glob.glob(os.path.join(out_dir, 'section-*.html')):
+        if path not in keep:
+            os.remove(path)
+
+
+def convert_markdown_to_html(md_content, settings, assets, output, section_cache=None):
+    """MarkdownをHTMLに変換（スタイルは共通のCSS/JSバンドルを参照）"""
+    return ''.join(iter_tutorial_html(md_content, settings, assets, output, section_cache))
+
+
+def write_chunks(path, chunks):
+    """断片を順にファイルへ書き出し、サイズを返す（ページ全体をメモリに作らない）
+
+    内容が前回と同じなら元のファイルを残し、更新日時を変えない（.gz / .br が古くならない）。
+    """
+    tmp_file = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    if os.path.exists(path) and filecmp.cmp(tmp_file, path, shallow=False):
+        os.remove(tmp_file)
+    else:
+        os.replace(tmp_file, path)
+    return os.path.getsize(path)
+
+
+def build_index(assets):
+    """トップページ（index.html）を共通のCSS/JSバンドルを参照する形で書き出す"""
+    output = os.path.join(BASE_DIR, 'index.html')
+    html_content = render_template(load_template('index'), asset_hrefs(assets, output))
+    try:
+        with open(output, 'r', encoding='utf-8') as f:
+            if f.read() == html_content:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    return True
+
+
+def build_tutorial(source, assets, force=False, split=False, examples=None, backend=None):
+    """1つのチュートリアルをビルドし、(出力ファイル, サイズ, 秒数, 変換したセクション数, 章ごとのページ) を返す
+
+    examples は run_examples.run_examples() の結果（{ソース: [例ごとの結果]}）。
+    backend はMarkdownのバックエンド（省略時は tutorials.toml のテンプレートの設定）。
+    """
+    start = time.perf_counter()
+    with open(source, 'r', encoding='utf-8') as f:
+        md_content = f.read()
+    if examples and examples.get(source):
+        from run_examples import embed_examples
+
+        md_content = embed_examples(md_content, examples[source])
+
+    output = output_path(source)
+    settings = tutorial_settings(source, backend)
+    enable_highlight_cache(use_existing=not force)
+    section_cache = SectionCache(source, reset=force)
+    size = write_chunks(output, iter_tutorial_html(
+        md_content, settings, assets, output, section_cache
+    ))
+    split_pages = []
+    if split:
+        split_pages = write_split_pages(md_content, settings, assets, source, section_cache)
+    section_cache.save()
+    # 全文検索のインデックスは、書き出したページから作る
+    build_search_index(output)
+
+    return output, size, time.perf_counter() - start, section_cache.converted, split_pages
+
+
+def build(sources=None, jobs=None, force=False, compress=True, split=False, examples=False,
+          backend=None, log=print):
+    """変更のあったチュートリアルをプロセスプールで並列にビルドする
+
+    compress=True なら、生成したHTMLと共通アセットの .gz / .br も作る。
+    split=True なら、1ページ版に加えて章ごとに分けたページ（<名前>/）も作る。
+    examples=True なら、examples/*.py を実行（変更がなければ前回の結果を使用）し、出力を埋め込む。
+    backend を指定すると、すべてのチュートリアルをそのMarkdownのバックエンドで変換する。
+    log には進み具合のメッセージを受け取る関数を渡す（ライブラリから使うときに黙らせる）。
+
+    ビルドしたチュートリアルの (ソース, 出力ファイル, サイズ, 秒数, 変換したセクション数, 章ごとのページ)
+    のリストを返す。失敗したときは BuildError のサブクラスを投げる。
+    """
+    if not sources:
+        sources = discover_sources()
+    if not sources:
+        raise ManifestError(f"{os.path.basename(MANIFEST_FILE)} にチュートリアルがありません。")
+
+    missing = [s for s in sources if not os.path.exists(s)]
+    if missing:
+        raise SourceNotFoundError(f"{', '.join(missing)} が見つかりません。")
+
+    start = time.perf_counter()
+
+    # 全ページ共通のCSS/JSバンドルとトップページ
+    try:
+        assets = build_assets(force=force)
+        index_written = build_index(assets)
+    except Exception as e:
+        raise BuildError(f"共通アセットのビルドに失敗しました: {type(e).__name__}: {e}") from e
+    if index_written:
+        log("index.html を生成しました。")
+
+    # 例の図を整理する（使われなくなった図を消す）前に、ページが使う画像を記録しておく
+    try:
+        record_page_images(sources)
+    except OSError as e:
+        raise BuildError(f"画像の参照の記録に失敗しました: {type(e).__name__}: {e}") from e
+
+    example_results = None
+    if examples:
+        from run_examples import results_key, run_examples
+
+        try:
+            example_results = run_examples(sources, jobs=jobs)
+        except Exception as e:
+            raise BuildError(f"例の実行に失敗しました: {type(e).__name__}: {e}") from e
+
+    # ハッシュが前回と同じで出力も残っていればスキップ
+    cache = load_cache()
+    keys = {}
+    stale = []
+    for source in sources:
+        examples_key = results_key(example_results[source]) if examples else None
+        keys[source] = build_key(source, tutorial_settings(source, backend), assets, split,
+                                 examples_key)
+        entry = cache.get(cache_entry_name(source))
+        if (not force and entry and entry['key'] == keys[source]
+                and os.path.exists(output_path(source))
+                and os.path.exists(shard_path(output_path(source)))
+                and all(os.path.exists(os.path.join(BASE_DIR, page))
+                        for page in entry.get('split_pages', []))):
+            continue
+        stale.append(source)
+
+    skipped = len(sources) - len(stale)
+    if skipped:
+        log(f"{skipped}件のチュートリアルは変更がないためスキップしました。")
+
+    results = build_stale(stale, cache, keys, assets, jobs=jobs, force=force, split=split,
+                          examples=example_results, backend=backend, log=log)
+    if results:
+        log(f"{len(results)}件のチュートリアルを {time.perf_counter() - start:.2f}秒でビルドしました。")
+
+    all_sources = sorted(set(discover_sources()) | {os.path.abspath(s) for s in sources})
+    if results:
+        prune_build_cache(all_sources)
+
+    # 検索ボックスが読む一覧には、指定されなかったチュートリアルも載せる
+    try:
+        manifest_written = build_manifest([
+            (output_path(source), tutorial_settings(source)['title']) for source in all_sources
+        ])
+    except Exception as e:
+        raise BuildError(f"検索インデックスの一覧の生成に失敗しました: {type(e).__name__}: {e}") from e
+    if manifest_written:
+        log("検索インデックスの一覧（search/index.json）を更新しました。")
+
+    if compress:
+        # 前回から内容が変わったファイルだけが圧縮し直される
+        targets = [output_path(source) for source in sources]
+        for source in sources:
+            entry = cache.get(cache_entry_name(source), {})
+            targets += [os.path.join(BASE_DIR, page) for page in entry.get('split_pages', [])]
+        targets += [shard_path(output_path(source)) for source in sources]
+        targets += [os.path.join(BASE_DIR, 'index.html'), os.path.join(BASE_DIR, 'search', 'index.json'),
+                    os.path.join(BASE_DIR, 'search', 'terms.json')]
+        targets += list(assets.values())
+        try:
+            written = precompress(targets, jobs=jobs, force=force)
+        except Exception as e:
+            raise BuildError(f"圧縮済みファイルの生成に失敗しました: {type(e).__name__}: {e}") from e
+        if written:
+            log(f"{len(written)}件の圧縮済みファイル（.gz / .br）を生成しました。")
+    return results
+
+
+def record_page_images(sources):
+    """Markdownの画像が置き場のどのファイルになるかを page:<名前> として記録する
+
+    同じ内容の例の図と置き場のファイルを共有するので、run_examples が図を消すときにこの記録を見る。
+    画像を使うページがなければ何もしない（asset_store とMarkdownのライブラリを読み込まない）。
+    """
+    images = {}
+    for source in sources:
+        with open(source, 'r', encoding='utf-8') as f:
+            images[source] = referenced_images(f.read())
+    if not any(images.values()):
+        return
+
+    from asset_store import file_url, record_references
+
+    for source, paths in images.items():
+        record_references(f'page:{cache_entry_name(source)}', [file_url(path) for path in paths])
+
+
+def prune_build_cache(sources):
+    """sources のどれも参照しなくなったセクションの断片とハイライトの結果をキャッシュから削除する
+
+    チュートリアルごとの断片は SectionCache.save() が整理するので、ここではなくなった
+    チュートリアルのディレクトリを消し、ハイライトはすべての index.json に載っているものだけを残す。
+    """
+    names = {os.path.splitext(os.path.basename(source))[0] for source in sources}
+    referenced = set()
+    if os.path.isdir(SECTION_CACHE_DIR):
+        for name in os.listdir(SECTION_CACHE_DIR):
+            directory = os.path.join(SECTION_CACHE_DIR, name)
+            if name not in names:
+                shutil.rmtree(directory, ignore_errors=True)
+                continue
+            referenced.update(load_section_index(directory)['highlights'])
+
+    for path in glob.glob(os.path.join(HIGHLIGHT_CACHE_DIR, '*', '*.html')):
+        if os.path.basename(path)[:-len('.html')] not in referenced:
+            os.remove(path)
+
+
+def build_stale(sources, cache, keys, assets, jobs=None, force=False, split=False, examples=None,
+                backend=None, log=print):
+    """チュートリアルを変換し、成功したものをビルドキャッシュに記録する
+
+    変換に失敗したチュートリアルがあれば、そこで TutorialBuildError を投げる。
+    """
+    if not sources:
+        return []
+
+    results = []
+    worker = functools.partial(build_tutorial, assets=assets, force=force, split=split,
+                               examples=examples, backend=backend)
+    if len(sources) == 1 or jobs == 1:
+        # 1件だけならプロセスを起動せずにそのまま変換する
+        outputs = map(worker, sources)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        outputs = executor.map(worker, sources)
+
+    try:
+        for source in sources:
+            try:
+                output, size, elapsed, converted, split_pages = next(outputs)
+            except Exception as e:
+                raise TutorialBuildError(source, e) from e
+            log(f"{os.path.basename(output)} を生成しました。"
+                f"（{size:,} bytes, {elapsed:.2f}秒, {converted}セクションを変換）")
+            if split_pages:
+                log(f"    章ごとのページ {len(split_pages)}件を "
+                    f"{os.path.basename(split_output_dir(source))}/ に生成しました。")
+            results.append((source, output, size, elapsed, converted, split_pages))
+            cache[cache_entry_name(source)] = {
+                'key': keys[source],
+                'output': cache_entry_name(output),
+                'split_pages': [cache_entry_name(page) for page in split_pages],
+            }
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        # 途中で失敗しても、成功した分はキャッシュに残す
+        save_cache(cache)
+    return results
+
+
+def watched_files(sources=None):
+    """監視するファイル（Markdown・テンプレート・tutorials.toml）と、その更新時刻・サイズ"""
+    paths = list(sources or discover_sources()) + [MANIFEST_FILE]
+    paths += glob.glob(os.path.join(TEMPLATE_DIR, '**', '*.*'), recursive=True)
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def watch(sources=None, interval=0.5, force=False, compress=True, split=False, examples=False,
+          backend=None):
+    """ファイルの変更を監視し、変更されたチュートリアルだけを再ビルドする
+
+    再ビルドはこのプロセスの中で行うので、Markdownの拡張機能やPygmentsは
+    一度読み込んだものがそのまま使われる（保存のたびに起動し直さない）。
+    """
+    build(sources, force=force, compress=compress, split=split, examples=examples, backend=backend)
+
+    # 最初の再ビルドも速くなるように、使うテンプレートの変換器を先に用意しておく
+    for source in sources or discover_sources():
+        settings = tutorial_settings(source, backend)
+        get_converter(settings['template'], markdown_backend(settings))
+
+    snapshot = watched_files(sources)
+    print(f"変更を監視しています（{interval}秒ごと, Ctrl+C で終了）...")
+    try:
+        while True:
+            time.sleep(interval)
+            current = watched_files(sources)
+            if current == snapshot:
+                continue
+            changed = [path for path in current if current[path] != snapshot.get(path)]
+            snapshot = current
+
+            try:
+                if MANIFEST_FILE in changed:
+                    # 設定が変わったチュートリアルは、キャッシュのハッシュが変わるので再ビルドされる
+                    reload_manifest()
+                    changed.remove(MANIFEST_FILE)
+                    targets = sources or discover_sources()
+                elif any(path.startswith(TEMPLATE_DIR) for path in changed):
+                    # テンプレートが変わったら、それを使うチュートリアルがキャッシュで判定される
+                    targets = sources or discover_sources()
+                else:
+                    targets = changed
+                if not targets:
+                    continue
+                # 執筆中は最大圧縮率の圧縮を待たずにすぐ確認できるようにする
+                build(targets, jobs=1, compress=False, split=split, examples=examples,
+                      backend=backend)
+            except Exception as e:
+                # 書きかけのファイルなどで失敗しても監視は続ける
+                print(f"エラーが発生しました: {e}")
+    except KeyboardInterrupt:
+        print("\n監視を終了しました。")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='チュートリアルのMarkdownをHTMLに一括変換')
+    parser.add_argument('sources', nargs='*',
+                        help='変換するMarkdownファイル（省略時は tutorials.toml のものをすべて変換）')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='並列ワーカー数（省略時はCPUコア数）')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='キャッシュを無視して全て再ビルドする')
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help='ファイルの変更を監視して自動で再ビルドする')
+    parser.add_argument('--interval', type=float, default=0.5,
+                        help='監視モードでファイルを確認する間隔（秒）')
+    parser.add_argument('--no-compress', dest='compress', action='store_false',
+                        help='圧縮済みファイル（.gz / .br）を作らない')
+    parser.add_argument('--split', action='store_true',
+                        help='章ごとに分けたページ（<名前>/section-NN.html）も作る')
+    parser.add_argument('--examples', action='store_true',
+                        help='examples/*.py を実行し、出力と図を対応する節に埋め込む（run_examples.py）')
+    parser.add_argument('--backend', choices=list(BACKENDS),
+                        help='Markdownのバックエンド（省略時は tutorials.toml のテンプレートの設定。'
+                             'markdown-it は markdown_backends.py を参照）')
+    parser.add_argument('--check-code', action='store_true',
+                        help='ビルド後にPythonのコードブロックを実行して確認する（check_code_blocks.py）')
+    parser.add_argument('--check-links', action='store_true',
+                        help='ビルド後にサイト全体のリンク切れを確認する（check_links.py）')
+    args = parser.parse_args()
+
+    try:
+        if args.watch:
+            watch(args.sources, interval=args.interval, force=args.force,
+                  compress=args.compress, split=args.split, examples=args.examples,
+                  backend=args.backend)
+            return
+        build(args.sources, jobs=args.jobs, force=args.force,
+              compress=args.compress, split=args.split, examples=args.examples,
+              backend=args.backend)
+    except BuildError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+    if args.check_code:
+        from check_code_blocks import check_sources, report
+
+        if report(check_sources(args.sources, jobs=args.jobs)):
+            sys.exit(1)
+    if args.check_links:
+        import check_links
+
+        pages = check_links.default_pages()
+        broken, duplicates = check_links.check_links(pages, jobs=args.jobs)
+        if check_links.report(broken, duplicates, pages):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
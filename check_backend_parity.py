@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+2つのMarkdownのバックエンドが同じHTMLを出すかを確認するスクリプト
+
+各チュートリアルを、基準のバックエンド（既定は markdown）と比べるバックエンド（既定は markdown-it）で
+それぞれ文書全体を変換し、本文のHTMLと見出しの情報（id・レベル・名前）を比べる。
+見出しのidが違うとページ内リンクや章ごとのページが壊れるので、見出しは別に確認する。
+違いが1つでもあれば終了コード 1 で終わるので、テンプレートの backend を切り替える前の確認に使う。
+
+使い方:
+    python check_backend_parity.py                            # 全チュートリアルを確認
+    python check_backend_parity.py NumPy_Tutorial_Complete.md
+    python check_backend_parity.py --diff                     # 違う箇所を unified diff で表示
+    python check_backend_parity.py --backends markdown,markdown-it
+"""
+
+import argparse
+import difflib
+import os
+import sys
+
+from build_tutorials import TEMPLATES, discover_sources, tutorial_settings
+from markdown_backends import create_converter, unsupported_extensions
+
+HEADING_KEYS = ('level', 'id', 'name')
+
+
+def convert(backend, source):
+    """source を backend で変換し、(HTML, 見出しの情報) を返す"""
+    template = TEMPLATES[tutorial_settings(source)['template']]
+    converter = create_converter(backend, template['extensions'], template['extension_configs'])
+    with open(source, 'r', encoding='utf-8') as f:
+        html_body = converter.convert(f.read())
+    headings = [tuple(heading[key] for key in HEADING_KEYS) for heading in converter.headings()]
+    return html_body, headings
+
+
+def compare(source, baseline, candidate):
+    """2つのバックエンドの結果の unified diff の行（本文, 見出し）を返す"""
+    name = os.path.basename(source)
+    baseline_html, baseline_headings = convert(baseline, source)
+    candidate_html, candidate_headings = convert(candidate, source)
+    body_diff = list(difflib.unified_diff(
+        baseline_html.splitlines(), candidate_html.splitlines(),
+        f'{name} ({baseline})', f'{name} ({candidate})', lineterm='',
+    ))
+    heading_diff = list(difflib.unified_diff(
+        [repr(heading) for heading in baseline_headings],
+        [repr(heading) for heading in candidate_headings],
+        f'{name} の見出し ({baseline})', f'{name} の見出し ({candidate})', lineterm='',
+    ))
+    return body_diff, heading_diff
+
+
+def count_hunks(diff):
+    return sum(1 for line in diff if line.startswith('@@'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='2つのMarkdownのバックエンドの出力を比べる')
+    parser.add_argument('sources', nargs='*',
+                        help='確認するMarkdownファイル（省略時は全チュートリアル）')
+    parser.add_argument('--backends', default='markdown,markdown-it',
+                        help='比べるバックエンド（基準,比べるもの）')
+    parser.add_argument('--diff', action='store_true',
+                        help='違う箇所を unified diff で表示する')
+    args = parser.parse_args()
+
+    baseline, candidate = args.backends.split(',')
+    failed = 0
+    for source in args.sources or discover_sources():
+        template = TEMPLATES[tutorial_settings(source)['template']]
+        ignored = unsupported_extensions(candidate, template['extensions'])
+        body_diff, heading_diff = compare(source, baseline, candidate)
+
+        name = os.path.basename(source)
+        if not body_diff and not heading_diff:
+            print(f"一致  {name}")
+        else:
+            failed += 1
+            print(f"違い  {name}: 本文 {count_hunks(body_diff)}箇所, 見出し {count_hunks(heading_diff)}箇所")
+        if ignored:
+            print(f"      {candidate} で再現しない拡張機能: {', '.join(ignored)}")
+        if args.diff:
+            for line in heading_diff + body_diff:
+                print(line)
+
+    print(f"\n{failed}件のチュートリアルで {baseline} と {candidate} の出力が違います。" if failed
+          else f"\nすべてのチュートリアルで {baseline} と {candidate} の出力が一致しました。")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
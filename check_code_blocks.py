@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+チュートリアルのPythonコードブロックが実行できるかを確認するスクリプト
+
+Markdownの ```python ブロックを取り出し、1つずつ別々のPythonプロセスで実行する。
+各ブロックは一時ディレクトリの中で、タイムアウト付き・matplotlibは画面のないバックエンド（Agg）で動かす。
+ブロックは前のブロックの import に頼って書かれていることが多いので、
+同じチュートリアルの import 文のうち、そのブロックで使う名前のものを先頭に付けてから実行する。
+
+結果（成功/失敗）はコードとライブラリのバージョンのハッシュごとに .build_cache/ に記録し、
+変更のないブロックは実行し直さない。
+インストールされていないライブラリを使うブロックは失敗ではなく「スキップ」として扱う。
+
+使い方:
+    python check_code_blocks.py                           # 全チュートリアルを確認
+    python check_code_blocks.py NumPy_Tutorial_Complete.md
+    python check_code_blocks.py -j 4 --timeout 60
+    python check_code_blocks.py --force                   # 記録を無視してすべて実行し直す
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+
+from build_tutorials import BASE_DIR, CACHE_DIR, FENCE_RE, discover_sources
+
+CHECK_CACHE_FILE = os.path.join(CACHE_DIR, 'code_checks.json')
+DEFAULT_TIMEOUT = 30
+
+# 実行方法を変えたら上げる（記録が無効になる）
+CHECK_VERSION = 1
+
+# 結果に影響するライブラリ（バージョンが変わったら実行し直す）
+LIBRARIES = ['numpy', 'pandas', 'matplotlib', 'seaborn', 'scipy', 'flask', 'flask-sqlalchemy']
+
+PYTHON_FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})\s*(python|py)\s*$')
+HEADING_RE = re.compile(r'^(#{1,6}) +(.+?)\s*#*\s*$')
+IMPORT_RE = re.compile(r'^(import \S|from \S+ import \S)')
+TIMEIT_RE = re.compile(r'^(\s*)%timeit\s+(.*)$', re.MULTILINE)
+MAGIC_RE = re.compile(r'^(\s*)([%!].*)$', re.MULTILINE)
+EXCEPTION_LINE_RE = re.compile(r'^[A-Za-z_][\w.]*(Error|Exception|Exit|Interrupt|Warning)\b')
+MISSING_MODULE_RE = re.compile(r"^ModuleNotFoundError: No module named '([^']+)'", re.MULTILINE)
+
+# 各ブロックの実行用のスクリプト
+# __name__ を '__main__' 以外にして、if __name__ == '__main__': の中（app.run() など）は動かさない
+RUNNER = """\
+import runpy
+runpy.run_path('block.py', run_name='__tutorial_block__')
+"""
+
+
+def extract_blocks(source):
+    """Markdownから ```python ブロックを取り出す
+
+    ブロックごとに {'line': 開始行, 'heading': 直前の見出し, 'chapter': 章の番号, 'code': コード} を返す。
+    章は # / ## の見出しで区切る。
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    blocks = []
+    heading = ''
+    chapter = 0
+    fence = None
+    code = []
+    start = 0
+    for number, line in enumerate(lines, 1):
+        match = FENCE_RE.match(line)
+        if fence is None:
+            if match:
+                fence = match.group(1)
+                python_fence = PYTHON_FENCE_RE.match(line)
+                code = [] if python_fence else None
+                start = number + 1
+            elif HEADING_RE.match(line):
+                level, heading = HEADING_RE.match(line).groups()
+                if len(level) <= 2:
+                    chapter += 1
+        elif match and line.strip() == match.group(1) and match.group(1).startswith(fence):
+            if code is not None:
+                # リストの中のコードブロックはインデントされている
+                code = textwrap.dedent('\n'.join(code)) + '\n'
+                blocks.append({
+                    'line': start, 'heading': heading, 'chapter': chapter,
+                    'code': strip_magics(code),
+                })
+            fence = None
+        elif code is not None:
+            code.append(line)
+    return blocks
+
+
+def strip_magics(code):
+    """Jupyter用のマジックコマンドを普通のPythonにする
+
+    %timeit 文 は文を1回だけ実行し、%matplotlib inline や !pip などは何もしない行にする。
+    """
+    code = TIMEIT_RE.sub(r'\1\2', code)
+    return MAGIC_RE.sub(r'\1pass  # \2', code)
+
+
+def shared_imports(blocks):
+    """すべてのブロックの（インデントされていない）import 文を重複なく集める"""
+    imports = []
+    for block in blocks:
+        for line in block['code'].splitlines():
+            if IMPORT_RE.match(line) and line not in imports:
+                imports.append(line)
+    return imports
+
+
+def imported_names(statement):
+    """import 文で使えるようになる名前（import numpy as np なら np）"""
+    names = statement.split(' import ', 1)[1] if statement.startswith('from ') else statement[7:]
+    bound = []
+    for name in names.split('#')[0].strip('() ').split(','):
+        parts = name.split()
+        if parts:
+            bound.append(parts[-1] if ' as ' in name else parts[0].split('.')[0])
+    return bound
+
+
+def block_prelude(code, imports):
+    """imports のうち、ブロックで使われている名前の import 文だけを返す
+
+    使わないライブラリの import でブロックが失敗（スキップ）しないようにする。
+    """
+    return [
+        statement for statement in imports
+        if any(re.search(rf'\b{re.escape(name)}\b', code) for name in imported_names(statement))
+    ]
+
+
+def library_versions():
+    versions = {}
+    for name in LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def block_key(code, versions):
+    """コード・Pythonとライブラリのバージョンから結果を識別するハッシュを作る"""
+    options = {
+        'check_version': CHECK_VERSION,
+        'python': sys.version,
+        'libraries': versions,
+    }
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8'))
+    digest.update(code.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_cache():
+    try:
+        with open(CHECK_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(CHECK_CACHE_FILE), exist_ok=True)
+    tmp_file = CHECK_CACHE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_file, CHECK_CACHE_FILE)
+
+
+def last_error_line(stderr):
+    """トレースバックから例外の種類とメッセージの行を取り出す"""
+    lines = [line for line in stderr.strip().splitlines() if line.strip()]
+    # SQLAlchemy などは例外の後に補足の行を出すので、最後の「例外名: 」の行を探す
+    for line in reversed(lines):
+        if EXCEPTION_LINE_RE.match(line):
+            return line
+    return lines[-1] if lines else ''
+
+
+def run_block(code, context='', timeout=DEFAULT_TIMEOUT):
+    """1つのブロックを新しいPythonプロセスで実行し、{'status': ..., 'error': ...} を返す
+
+    status は 'pass' / 'fail' / 'skip'（ライブラリがインストールされていない）。
+    前のブロックの変数を使っていて NameError になった場合は、
+    同じ章の前のブロック（context）を先に実行してからもう一度試す。
+    """
+    result = run_code(code, timeout)
+    if result['status'] == 'fail' and context and result['error'].startswith('NameError'):
+        retried = run_code(f'{context}\n\n{code}', timeout)
+        if retried['status'] != 'fail':
+            return retried
+    return result
+
+
+def run_code(code, timeout):
+    """コードを一時ディレクトリの中で実行し、run_block と同じ形の結果を返す"""
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONDONTWRITEBYTECODE='1', PYTHONIOENCODING='utf-8')
+    # ブロックが作るファイル（data.csv など）はリポジトリに残さない
+    with tempfile.TemporaryDirectory(prefix='tutorial_block_') as work_dir:
+        with open(os.path.join(work_dir, 'block.py'), 'w', encoding='utf-8') as f:
+            f.write(code)
+        try:
+            result = subprocess.run(
+                [sys.executable, '-c', RUNNER], cwd=work_dir, env=env,
+                # input() には空の入力（Enterだけ）を返す
+                input='\n' * 100, capture_output=True, text=True,
+                encoding='utf-8', errors='replace', timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return {'status': 'fail', 'error': f'{timeout}秒以内に終わりませんでした'}
+
+    if result.returncode == 0:
+        return {'status': 'pass', 'error': ''}
+    missing = MISSING_MODULE_RE.search(result.stderr)
+    if missing:
+        return {'status': 'skip', 'error': f"{missing.group(1)} がインストールされていません"}
+    return {'status': 'fail', 'error': last_error_line(result.stderr)}
+
+
+def check_sources(sources=None, jobs=None, timeout=DEFAULT_TIMEOUT, force=False):
+    """チュートリアルのコードブロックを並列に実行し、ブロックごとの結果のリストを返す
+
+    各ブロックは別プロセスで動くので、タイムアウトしたものだけを止められる。
+    スレッドはプロセスの終了を待つだけなので、GILで遅くなることはない。
+    """
+    if not sources:
+        sources = discover_sources()
+    versions = library_versions()
+    # チュートリアル → {ブロックのハッシュ: 結果}
+    cache = load_cache()
+
+    results = []
+    pending = []
+    for source in sources:
+        name = os.path.relpath(os.path.abspath(source), BASE_DIR)
+        recorded = {} if force else cache.get(name, {})
+        blocks = extract_blocks(source)
+        imports = shared_imports(blocks)
+        for number, block in enumerate(blocks):
+            prelude = '\n'.join(block_prelude(block['code'], imports))
+            code = f'{prelude}\n\n{block["code"]}' if prelude else block['code']
+            context = '\n\n'.join(
+                previous['code'] for previous in blocks[:number]
+                if previous['chapter'] == block['chapter']
+            )
+            if context:
+                context = '\n'.join(block_prelude(context, imports)) + '\n\n' + context
+            key = block_key(f'{context}\0{code}', versions)
+            result = {
+                'source': name,
+                'line': block['line'],
+                'heading': block['heading'],
+                'key': key,
+                'cached': key in recorded,
+            }
+            if key in recorded:
+                result.update(recorded[key])
+            else:
+                pending.append((result, code, context))
+            results.append(result)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            futures = [
+                executor.submit(run_block, code, context, timeout)
+                for _, code, context in pending
+            ]
+            for (result, _, _), future in zip(pending, futures):
+                result.update(future.result())
+
+    # 確認したチュートリアルの記録を今回の結果で置き換える（消えたブロックの記録は残さない）
+    # スキップしたブロックは、ライブラリを入れたら実行し直したいので記録しない
+    for source in sources:
+        cache[os.path.relpath(os.path.abspath(source), BASE_DIR)] = {}
+    for result in results:
+        if result['status'] != 'skip':
+            cache[result['source']][result['key']] = {
+                'status': result['status'], 'error': result['error'],
+            }
+    save_cache(cache)
+    return results
+
+
+def report(results):
+    """失敗とスキップの一覧と件数を表示し、失敗があれば True を返す"""
+    counts = {'pass': 0, 'fail': 0, 'skip': 0}
+    skipped = {}
+    for result in results:
+        counts[result['status']] += 1
+        if result['status'] == 'fail':
+            print(f"{result['source']}:{result['line']} （{result['heading']}）")
+            print(f"    失敗: {result['error']}")
+        elif result['status'] == 'skip':
+            skipped[result['error']] = skipped.get(result['error'], 0) + 1
+
+    for reason, count in sorted(skipped.items()):
+        print(f"スキップ: {reason}（{count}ブロック）")
+    cached = sum(1 for result in results if result['cached'])
+    print(f"{len(results)}ブロック: 成功 {counts['pass']}, 失敗 {counts['fail']}, "
+          f"スキップ {counts['skip']}（うち {cached}ブロックは前回の結果を使用）")
+    return counts['fail'] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='チュートリアルのPythonコードブロックを実行して確認する')
+    parser.add_argument('sources', nargs='*',
+                        help='確認するMarkdownファイル（省略時は全チュートリアル）')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='同時に実行するブロック数（省略時はCPUコア数）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='1ブロックあたりの制限時間（秒）')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='前回の結果を使わずにすべて実行し直す')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = check_sources(args.sources, jobs=args.jobs, timeout=args.timeout, force=args.force)
+    failed = report(results)
+    print(f"{time.perf_counter() - start:.2f}秒")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+生成したサイトのリンク切れを確認するスクリプト
+
+index.html・各チュートリアルのHTML・章ごとのページを並列に読み、ページごとのidの一覧を作ってから、
+すべてのリンク（href・src・srcset）について次のものを報告する。
+
+    ページ内リンク   #id のidがそのページにない（目次やスムーススクロールが効かない）
+    ページ間リンク   リンク先のファイルがない、または page.html#id のidがリンク先のページにない
+
+HTMLは少しずつ読みながら HTMLParser で処理するので、時間はページの大きさに比例し、
+水増ししたベンチマーク用の大きなページでもメモリに全体を載せない。
+外部のURL（http: / mailto: など）は確認しない。
+
+使い方:
+    python check_links.py                     # 生成済みのサイト全体を確認
+    python check_links.py NumPy_Tutorial_Complete.html
+    python check_links.py path/to/site/       # ディレクトリの中のHTMLをすべて確認
+    python check_links.py -j 4
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from build_tutorials import BASE_DIR
+
+CHUNK_SIZE = 64 * 1024
+
+# リンクとして確認する属性
+LINK_ATTRIBUTES = {'href', 'src'}
+# 確認しないURL（外部のページやスクリプト）
+EXTERNAL_SCHEMES = ('http', 'https', 'mailto', 'javascript', 'data', 'tel')
+
+
+class LinkExtractor(HTMLParser):
+    """HTMLのidの一覧と、リンク（行番号, URL）の一覧を集める"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ids = set()
+        self.duplicate_ids = set()
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if value is None:
+                continue
+            if name == 'id' or (tag == 'a' and name == 'name'):
+                if value in self.ids and name == 'id':
+                    self.duplicate_ids.add(value)
+                self.ids.add(value)
+            elif name in LINK_ATTRIBUTES:
+                self.links.append((self.getpos()[0], value))
+            elif name == 'srcset':
+                for candidate in value.split(','):
+                    if candidate.strip():
+                        self.links.append((self.getpos()[0], candidate.split()[0]))
+
+    handle_startendtag = handle_starttag
+
+
+def scan_page(path):
+    """1ページを少しずつ読み、(パス, idの集合, 重複したid, リンクのリスト) を返す"""
+    parser = LinkExtractor()
+    with open(path, 'r', encoding='utf-8') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            parser.feed(chunk)
+    parser.close()
+    return path, parser.ids, parser.duplicate_ids, parser.links
+
+
+def default_pages(base_dir=BASE_DIR):
+    """確認するHTML（トップページ・各チュートリアル・章ごとのページ）"""
+    paths = glob.glob(os.path.join(base_dir, '*.html'))
+    paths += glob.glob(os.path.join(base_dir, '*_Tutorial_Complete', '*.html'))
+    return sorted(paths)
+
+
+def expand_paths(paths):
+    """引数のファイルとディレクトリ（の中のHTML）を、確認するページのリストにする"""
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            pages += sorted(glob.glob(os.path.join(path, '**', '*.html'), recursive=True))
+        else:
+            pages.append(path)
+    return [os.path.abspath(page) for page in pages]
+
+
+def resolve_link(page, url):
+    """リンクの (リンク先のファイル, id) を返す。外部のURLや確認しないものは None"""
+    parts = urlsplit(url)
+    if parts.scheme in EXTERNAL_SCHEMES or parts.netloc or url.startswith('//'):
+        return None
+    if parts.scheme:
+        # 知らない形式のURLは確認しない
+        return None
+    fragment = unquote(parts.fragment)
+    if not parts.path:
+        return page, fragment
+    target = os.path.normpath(os.path.join(os.path.dirname(page), unquote(parts.path)))
+    if parts.path.endswith('/') or os.path.isdir(target):
+        target = os.path.join(target, 'index.html')
+    return target, fragment
+
+
+def check_links(pages, jobs=None):
+    """ページを並列に読んでidの一覧を作り、(リンク切れ, 重複したid) のリストを返す
+
+    リンク切れは (ページ, 行, URL, 理由) のリスト。
+    """
+    index = {}
+    duplicates = []
+    links = {}
+    # 大きなページが多いときはプロセスで並列に読む（HTMLParser はPythonで動くのでGILを解放しない）
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for path, ids, duplicate_ids, page_links in executor.map(scan_page, pages, chunksize=4):
+            index[path] = ids
+            links[path] = page_links
+            duplicates += [(path, duplicate_id) for duplicate_id in sorted(duplicate_ids)]
+
+    broken = []
+    for page in pages:
+        for line, url in links[page]:
+            resolved = resolve_link(page, url)
+            if resolved is None:
+                continue
+            target, fragment = resolved
+            if not os.path.exists(target):
+                broken.append((page, line, url, 'リンク先のファイルがありません'))
+                continue
+            if not fragment or fragment == 'top' or not target.endswith('.html'):
+                continue
+            if target not in index:
+                # 確認対象の外のページは、リンクされているときだけ読む
+                index[target] = scan_page(target)[1]
+            if fragment not in index[target]:
+                reason = 'ページ内にidがありません' if target == page else 'リンク先のページにidがありません'
+                broken.append((page, line, url, reason))
+    return broken, duplicates
+
+
+def report(broken, duplicates, pages):
+    """結果を表示し、リンク切れの数を返す"""
+    for page, line, url, reason in broken:
+        print(f"{os.path.relpath(page, BASE_DIR)}:{line}: {url} （{reason}）")
+    for page, duplicate_id in duplicates:
+        print(f"{os.path.relpath(page, BASE_DIR)}: id=\"{duplicate_id}\" が重複しています")
+    print(f"\n{len(pages)}ページを確認しました: リンク切れ {len(broken)}件, 重複したid {len(duplicates)}件")
+    return len(broken)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成したサイトのリンク切れを確認する')
+    parser.add_argument('paths', nargs='*',
+                        help='確認するHTMLファイルかディレクトリ（省略時は生成済みのサイト全体）')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='並列ワーカー数（省略時はCPUコア数）')
+    args = parser.parse_args()
+
+    pages = expand_paths(args.paths) if args.paths else default_pages()
+    if not pages:
+        print("エラー: 確認するHTMLがありません。先に build_tutorials.py でビルドしてください。")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    broken, duplicates = check_links(pages, jobs=args.jobs)
+    failed = report(broken, duplicates, pages)
+    print(f"{time.perf_counter() - start:.2f}秒")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+全チュートリアルを印刷用のHTMLとPDFに書き出すスクリプト
+
+チュートリアルごとに、ナビゲーションやスクリプトのない1ページのHTML（print/<名前>.html）を作る。
+画像は data: URI にして埋め込み、CSSもテンプレートのものを中に入れるので、このファイルだけで印刷できる。
+章（h2）ごとの改ページや、図の途中で改ページしない指定も入れる。
+1ページに収まらない長いコードブロックは、描画できるように60行ごとに分ける。
+
+そのHTMLを、ローカルで動くPDFの描画エンジンで print/<名前>.pdf にする（プロセスプールで並列に）。
+    weasyprint   CSSの対応が広い（pip install weasyprint、Pango などのライブラリも必要）
+    xhtml2pdf    Pythonだけで動く（pip install xhtml2pdf）
+どちらもなければ印刷用のHTMLだけを作る。
+
+印刷用のHTMLと描画エンジンのハッシュを .build_cache/ に記録し、変わったチュートリアルだけを描画し直す。
+
+使い方:
+    python export_print.py                    # 全チュートリアルを書き出す
+    python export_print.py NumPy_Tutorial_Complete.md
+    python export_print.py --no-pdf           # 印刷用のHTMLだけを作る
+    python export_print.py --renderer xhtml2pdf
+    python export_print.py --force            # 記録を無視してすべて描画し直す
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import build_tutorials
+from build_assets import pygments_css
+
+BASE_DIR = build_tutorials.BASE_DIR
+PRINT_DIR = os.path.join(BASE_DIR, 'print')
+PRINT_CACHE_FILE = os.path.join(build_tutorials.CACHE_DIR, 'print.json')
+RENDERERS = ['weasyprint', 'xhtml2pdf']
+
+# 印刷用のHTMLの作り方を変えたら上げる（記録が無効になる）
+PRINT_VERSION = 2
+
+# <picture> の WebP/AVIF はPDFの描画エンジンが読めないので、中の <img> だけを残す
+PICTURE_RE = re.compile(r'<picture>(?:<source [^>]*>)*(<img [^>]*>)</picture>')
+# サイト内の画像（data: URI にして埋め込む）
+LOCAL_IMAGE_RE = re.compile(r'(<img [^>]*?\bsrc=")(?!data:|[a-z]+://)([^"]+)(")')
+# 印刷では意味のない属性
+LAZY_ATTRIBUTE_RE = re.compile(r' (?:loading="lazy"|decoding="async")')
+# コードブロックと、その中で開いている要素
+PRE_RE = re.compile(r'(<pre\b[^>]*>)(.*?)</pre>', re.S)
+INLINE_TAG_RE = re.compile(r'<(/?)(span|code)\b[^>]*>')
+# xhtml2pdf は1ページより長いコードブロックを描画できないので、この行数ごとに分ける
+CODE_BLOCK_LINES = 60
+
+
+def renderer_version(name):
+    """PDFの描画エンジンのバージョン（使えなければ None）"""
+    try:
+        if name == 'weasyprint':
+            import weasyprint
+            return weasyprint.__version__
+        if name == 'xhtml2pdf':
+            import xhtml2pdf
+            return xhtml2pdf.__version__
+    except (ImportError, OSError):
+        # weasyprint は Pango などのライブラリがないと OSError になる
+        return None
+    return None
+
+
+def find_renderer(preferred=None):
+    """使うPDFの描画エンジンの名前（使えるものがなければ None）"""
+    for name in ([preferred] if preferred else RENDERERS):
+        if renderer_version(name):
+            return name
+    return None
+
+
+def print_paths(source):
+    """印刷用のHTMLとPDFのパス"""
+    stem = os.path.splitext(os.path.basename(build_tutorials.output_path(source)))[0]
+    return os.path.join(PRINT_DIR, stem + '.html'), os.path.join(PRINT_DIR, stem + '.pdf')
+
+
+def inline_images(body):
+    """サイト内の画像を data: URI にする（見つからない画像はそのまま）"""
+    def replace(match):
+        path = os.path.join(BASE_DIR, match.group(2))
+        mime = mimetypes.guess_type(path)[0]
+        if mime is None or not os.path.isfile(path):
+            return match.group(0)
+        with open(path, 'rb') as f:
+            data = base64.b64encode(f.read()).decode('ascii')
+        return f'{match.group(1)}data:{mime};base64,{data}{match.group(3)}'
+
+    body = PICTURE_RE.sub(r'\1', body)
+    body = LAZY_ATTRIBUTE_RE.sub('', body)
+    return LOCAL_IMAGE_RE.sub(replace, body)
+
+
+def split_code_blocks(body, max_lines=CODE_BLOCK_LINES):
+    """長いコードブロックを max_lines 行ごとの <pre> に分ける（開いている <span> は閉じて開き直す）"""
+    def split(match):
+        start, content = match.group(1), match.group(2)
+        lines = content.split('\n')
+        if len(lines) <= max_lines:
+            return match.group(0)
+        blocks = []
+        opened = []
+        for i in range(0, len(lines), max_lines):
+            chunk = '\n'.join(lines[i:i + max_lines])
+            reopened = ''.join(opened)
+            for tag in INLINE_TAG_RE.finditer(chunk):
+                if tag.group(1):
+                    if opened:
+                        opened.pop()
+                else:
+                    opened.append(tag.group(0))
+            closing = ''.join(f'</{INLINE_TAG_RE.match(tag).group(2)}>' for tag in reversed(opened))
+            blocks.append(f'{start}{reopened}{chunk}{closing}</pre>')
+        return '\n'.join(blocks)
+
+    return PRE_RE.sub(split, body)
+
+
+def print_style(template):
+    """テンプレートの画面用CSSと、紙に合わせた明るい配色のPygmentsのCSS"""
+    path = os.path.join(build_tutorials.TEMPLATE_DIR, 'css', template + '.css')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read() + '\n' + pygments_css(style='default')
+
+
+def print_html(source):
+    """チュートリアルの印刷用のHTML"""
+    settings = build_tutorials.tutorial_settings(source)
+    with open(source, 'r', encoding='utf-8') as f:
+        md_content = f.read()
+    body = build_tutorials.render_markdown(md_content, settings)
+    return build_tutorials.render_template(build_tutorials.load_template('print'), {
+        'title': settings['title'],
+        'footer': settings['footer'],
+        'style': print_style(settings['template']),
+        'body': split_code_blocks(inline_images(body)),
+    })
+
+
+def print_key(html_content, renderer):
+    """描画結果を識別するハッシュ（印刷用のHTMLと描画エンジン）"""
+    digest = hashlib.sha256(f'{PRINT_VERSION} {renderer} {renderer_version(renderer)}'.encode('utf-8'))
+    digest.update(html_content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_pdf(html_content, path, renderer):
+    """印刷用のHTMLをPDFに描画する"""
+    tmp_file = f'{path}.{os.getpid()}.tmp'
+    try:
+        if renderer == 'weasyprint':
+            import weasyprint
+
+            weasyprint.HTML(string=html_content, base_url=BASE_DIR).write_pdf(tmp_file)
+        else:
+            from xhtml2pdf import pisa
+
+            # 対応していないCSSの警告などが大量に出るので、エラーだけを表示する
+            logging.getLogger('xhtml2pdf').setLevel(logging.ERROR)
+            with open(tmp_file, 'wb') as f:
+                result = pisa.CreatePDF(html_content, dest=f, encoding='utf-8')
+            if result.err:
+                raise RuntimeError(f"xhtml2pdf のエラーが {result.err}件ありました")
+        os.replace(tmp_file, path)
+    finally:
+        # 描画に失敗したときに、書きかけのファイルを残さない
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def export_tutorial(source, previous_key=None, renderer=None, force=False):
+    """1つのチュートリアルを書き出し、(ソース, ハッシュ, HTMLを書いたか, 描画したか, 秒数) を返す
+
+    印刷用のHTMLは内容が変わったときだけ書き換え、PDFはハッシュが前回と違うときだけ描画する。
+    renderer が None なら、描画したかは None にする（PDFは確かめない）。
+    """
+    start = time.perf_counter()
+    build_tutorials.enable_highlight_cache()
+    html_content = print_html(source)
+    html_path, pdf_path = print_paths(source)
+
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            unchanged = f.read() == html_content
+    except FileNotFoundError:
+        unchanged = False
+    if not unchanged:
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    written = not unchanged
+
+    if renderer is None:
+        return source, None, written, None, time.perf_counter() - start
+    key = print_key(html_content, renderer)
+    if force or key != previous_key or not os.path.exists(pdf_path):
+        write_pdf(html_content, pdf_path, renderer)
+        return source, key, written, True, time.perf_counter() - start
+    return source, key, written, False, time.perf_counter() - start
+
+
+def load_cache():
+    try:
+        with open(PRINT_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(PRINT_CACHE_FILE), exist_ok=True)
+    tmp_file = PRINT_CACHE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, PRINT_CACHE_FILE)
+
+
+def export(sources=None, jobs=None, renderer=None, pdf=True, force=False):
+    """チュートリアルを並列に書き出し、(ソース, HTMLを書いたか, 描画したか, 秒数, エラー) のリストを返す
+
+    PDFの描画エンジンを使わない（pdf=False か見つからない）ときは、描画したかが None になる。
+
+    描画に失敗したチュートリアルは、エラーの内容を入れて返す（ほかのチュートリアルは続ける）。
+    """
+    sources = sources or build_tutorials.discover_sources()
+    if pdf:
+        name = find_renderer(renderer)
+        if name is None:
+            print("PDFの描画エンジンがないため、印刷用のHTMLだけを作ります"
+                  "（pip install weasyprint か pip install xhtml2pdf）。")
+        renderer = name
+    else:
+        renderer = None
+
+    os.makedirs(PRINT_DIR, exist_ok=True)
+    cache = load_cache()
+    results = []
+    # PDFの描画はCPUを使い続けるので、チュートリアルごとにプロセスを分ける
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(export_tutorial, source, cache.get(build_tutorials.cache_entry_name(source)),
+                            renderer, force)
+            for source in sources
+        ]
+        try:
+            for source, future in zip(sources, futures):
+                try:
+                    _, key, written, rendered, elapsed = future.result()
+                except Exception as e:
+                    rendered = None if renderer is None else False
+                    results.append((source, False, rendered, 0.0, f'{type(e).__name__}: {e}'))
+                    continue
+                if key is not None:
+                    cache[build_tutorials.cache_entry_name(source)] = key
+                results.append((source, written, rendered, elapsed, None))
+        finally:
+            # 途中で失敗しても、描画できた分は記録に残す
+            save_cache(cache)
+    return results
+
+
+def report(results):
+    """結果を表示し、失敗したチュートリアルの数を返す"""
+    for source, written, rendered, elapsed, error in results:
+        html_path, pdf_path = print_paths(source)
+        # PDFを描画しない実行（--no-pdf か描画エンジンがない）では、前からあるPDFは確かめていない
+        path = html_path if rendered is None else pdf_path
+        if error:
+            state = f"失敗しました（{error}）"
+        elif rendered:
+            state = f"描画しました（{elapsed:.2f}秒）"
+        elif written:
+            state = f"印刷用のHTMLを書き出しました（{elapsed:.2f}秒）"
+        else:
+            state = "変更がないためスキップしました"
+        name = os.path.basename(path)
+        print(f"print/{name}: {state}")
+    return sum(1 for result in results if result[4])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全チュートリアルを印刷用のHTMLとPDFに書き出す')
+    parser.add_argument('sources', nargs='*',
+                        help='書き出すMarkdownファイル（省略時は全チュートリアル）')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='並列ワーカー数（省略時はCPUコア数）')
+    parser.add_argument('--renderer', choices=RENDERERS,
+                        help='PDFの描画エンジン（省略時は使えるものを順に探す）')
+    parser.add_argument('--no-pdf', dest='pdf', action='store_false',
+                        help='印刷用のHTMLだけを作る')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='前回の記録を使わずにすべて描画し直す')
+    args = parser.parse_args()
+
+    if args.renderer and not renderer_version(args.renderer):
+        print(f"エラー: {args.renderer} がインストールされていません。")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    failed = report(export(args.sources, jobs=args.jobs, renderer=args.renderer, pdf=args.pdf,
+                           force=args.force))
+    print(f"{time.perf_counter() - start:.2f}秒")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
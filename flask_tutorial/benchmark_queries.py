@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+database_example.py の一覧ページのクエリを、マイグレーションの前と後で比べるベンチマーク
+
+インデックスのない古いスキーマのSQLite（一時ファイル）に大量の行を入れ、各ページが発行するSQLの
+実行計画（EXPLAIN QUERY PLAN）と時間を計ってから、database_example.migrate() でインデックスを足して
+もう一度計る。テーブル全体を読む SCAN が、インデックスを使う SEARCH に変わることを確かめられる。
+
+各ページのSQLは、メモリ上のデータベースで実際にページを表示して記録したものを使う。
+
+使い方:
+    python benchmark_queries.py               # 20万投稿で比べる
+    python benchmark_queries.py --posts 1000000 --repeat 10
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# database_example を読み込む前に、メモリ上のデータベースに切り替える（SQLの記録用）
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from sqlalchemy import create_engine, event
+
+from check_query_count import seed
+from database_example import app, db, migrate
+
+# 比べるページ（user 1 と tag1 は、記録用と計測用のどちらのデータベースにもある）
+PAGES = ['/', '/users', '/user/1', '/tag/tag1']
+
+# インデックスを足す前のスキーマ（マイグレーションを作る前の database_example.py のもの）
+OLD_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL PRIMARY KEY,
+    username VARCHAR(80) NOT NULL UNIQUE,
+    email VARCHAR(120) NOT NULL UNIQUE,
+    created_at DATETIME
+);
+CREATE TABLE post (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR(100) NOT NULL,
+    content TEXT NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    user_id INTEGER NOT NULL REFERENCES user (id)
+);
+CREATE TABLE tag (
+    id INTEGER NOT NULL PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE
+);
+CREATE TABLE post_tags (
+    post_id INTEGER NOT NULL REFERENCES post (id),
+    tag_id INTEGER NOT NULL REFERENCES tag (id),
+    PRIMARY KEY (post_id, tag_id)
+);
+"""
+
+
+def record_statements():
+    """メモリ上のデータベースで各ページを表示し、{URL: [(SQL, パラメーター)]} を返す"""
+    statements = {}
+    with app.app_context():
+        seed(3, 30)
+        client = app.test_client()
+        for url in PAGES:
+            recorded = statements[url] = []
+
+            def record(conn, cursor, statement, parameters, context, executemany):
+                recorded.append((statement, parameters))
+
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                client.get(url)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def create_old_database(path, users, posts, tags):
+    """インデックスのない古いスキーマのデータベースを作り、行を入れる"""
+    rng = random.Random(0)
+    start = datetime(2020, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executescript(OLD_SCHEMA)
+    conn.executemany('INSERT INTO user (id, username, email, created_at) VALUES (?, ?, ?, ?)', (
+        (i, f'user{i}', f'user{i}@example.com', str(start)) for i in range(1, users + 1)
+    ))
+    conn.executemany('INSERT INTO tag (id, name) VALUES (?, ?)', (
+        (i, f'tag{i}') for i in range(1, tags + 1)
+    ))
+    conn.executemany(
+        'INSERT INTO post (id, title, content, created_at, updated_at, user_id) VALUES (?, ?, ?, ?, ?, ?)',
+        ((i, f'投稿{i}', '本文' * 50, str(start + timedelta(seconds=i * 60)), str(start),
+          rng.randint(1, users)) for i in range(1, posts + 1))
+    )
+    conn.executemany('INSERT INTO post_tags (post_id, tag_id) VALUES (?, ?)', (
+        (i, tag_id) for i in range(1, posts + 1) for tag_id in {rng.randint(1, tags), rng.randint(1, tags)}
+    ))
+    conn.commit()
+    conn.close()
+
+
+def query_plan(conn, statement, parameters):
+    """EXPLAIN QUERY PLAN の結果を1行にまとめる"""
+    rows = conn.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return '; '.join(row[-1] for row in rows)
+
+
+def measure(path, statements, repeat):
+    """各ページのSQLの (実行計画, 中央値のミリ秒) を返す"""
+    results = {}
+    conn = sqlite3.connect(path)
+    try:
+        for url, page_statements in statements.items():
+            results[url] = []
+            for statement, parameters in page_statements:
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    conn.execute(statement, parameters).fetchall()
+                    times.append((time.perf_counter() - start) * 1000)
+                results[url].append((query_plan(conn, statement, parameters), statistics.median(times)))
+    finally:
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='一覧ページのクエリをマイグレーションの前と後で比べる')
+    parser.add_argument('--posts', type=int, default=200_000, help='投稿数')
+    parser.add_argument('--users', type=int, default=2_000, help='ユーザー数')
+    parser.add_argument('--tags', type=int, default=50, help='タグの数')
+    parser.add_argument('--repeat', type=int, default=5, help='1つのSQLを実行する回数（中央値を表示）')
+    args = parser.parse_args()
+
+    statements = record_statements()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'benchmark.db')
+        start = time.perf_counter()
+        create_old_database(path, args.users, args.posts, args.tags)
+        print(f"{args.posts:,}投稿・{args.users:,}ユーザーのデータベースを "
+              f"{time.perf_counter() - start:.1f}秒で作りました。\n")
+
+        before = measure(path, statements, args.repeat)
+        engine = create_engine(f'sqlite:///{path}')
+        old_version, new_version = migrate(engine)
+        engine.dispose()
+        after = measure(path, statements, args.repeat)
+
+    print(f"マイグレーション: バージョン {old_version} → {new_version}\n")
+    for url in PAGES:
+        print(f"{url}")
+        for (before_plan, before_ms), (after_plan, after_ms) in zip(before[url], after[url]):
+            print(f"  前 {before_ms:9.2f}ms  {before_plan}")
+            speedup = f"  （{before_ms / after_ms:.0f}倍）" if after_ms else ''
+            print(f"  後 {after_ms:9.2f}ms  {after_plan}{speedup}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
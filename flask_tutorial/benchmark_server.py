@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+database_example.py のSQLiteの設定のプロファイルごとに、読み書きが混ざった負荷での req/s を比べるベンチマーク
+
+プロファイル（SQLITE_PROFILES）ごとに、一時ファイルのデータベースに seed コマンドでデータを入れ、
+マルチスレッドのWSGIサーバーを別のプロセスで起動する。そこへ複数のスレッドから、一覧や詳細ページの
+読み込みと新規投稿（POST /add_post）を決まった割合で送り続け、成功したリクエストの数・エラーの数・
+応答時間を集計する。
+
+default（ロールバックジャーナル）では書き込みの間は読み込みも待たされ、待ちきれなければ
+"database is locked"（500）になる。production（WAL）では読み込みが書き込みを待たない。
+
+使い方:
+    python benchmark_server.py                # 全プロファイルを10秒ずつ
+    python benchmark_server.py --clients 32 --writes 0.3 --duration 20
+    python benchmark_server.py --profiles production --posts 1000000
+"""
+
+import argparse
+import http.client
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 読み込みで開くページ（{user} と {post} は乱数で埋める）
+READ_PAGES = ['/', '/users', '/api/posts', '/user/{user}', '/post/{post}', '/tag/tag{tag}']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(port):
+    """このプロセスで database_example のアプリをマルチスレッドのサーバーで配信する（--serve で使う）"""
+    import logging
+
+    from werkzeug.serving import make_server
+
+    from database_example import app
+
+    # リクエストごとのログは計測の邪魔になるので出さない
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def start_server(env, port):
+    """サーバーのプロセスを起動し、応答するようになるまで待つ"""
+    process = subprocess.Popen([sys.executable, __file__, '--serve', str(port)], cwd=BASE_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("サーバーが起動できませんでした")
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("サーバーが応答しません")
+
+
+def request_once(port, rng, args):
+    """1回のリクエストを送り、(書き込みか, 成功したか, 秒数) を返す"""
+    write = rng.random() < args.writes
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    start = time.perf_counter()
+    try:
+        if write:
+            body = urlencode({
+                'title': '負荷試験の投稿', 'content': '本文' * 20,
+                'user_id': rng.randint(1, args.users), 'tags': f'tag{rng.randint(1, 50)}',
+            })
+            conn.request('POST', '/add_post', body, {'Content-Type': 'application/x-www-form-urlencoded'})
+        else:
+            page = rng.choice(READ_PAGES).format(
+                user=rng.randint(1, args.users), post=rng.randint(1, args.posts), tag=rng.randint(1, 50),
+            )
+            conn.request('GET', page)
+        status = conn.getresponse().status
+        ok = status < 400
+    except (OSError, http.client.HTTPException):
+        ok = False
+    finally:
+        conn.close()
+    return write, ok, time.perf_counter() - start
+
+
+def run_load(port, args):
+    """args.duration 秒の間、args.clients 個のスレッドからリクエストを送り続けて結果を集める"""
+    results = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def client(number):
+        rng = random.Random(number)
+        local = []
+        while time.monotonic() < deadline:
+            local.append(request_once(port, rng, args))
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def benchmark_profile(profile, args):
+    """1つのプロファイルでデータベースを作り、負荷をかけた結果を返す"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(tmp_dir, "blog.db")}',
+                   SQLITE_PROFILE=profile)
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'database_example', 'seed', '--reset',
+                        '--users', str(args.users), '--posts', str(args.posts), '--seed', '0'],
+                       cwd=BASE_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+        port = free_port()
+        process = start_server(env, port)
+        try:
+            return run_load(port, args)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def summarize(profile, results, duration):
+    reads = [elapsed for write, ok, elapsed in results if ok and not write]
+    writes = [elapsed for write, ok, elapsed in results if ok and write]
+    errors = sum(1 for _, ok, _ in results if not ok)
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 20 else float('nan')
+
+    print(f"{profile:12} {(len(reads) + len(writes)) / duration:8.1f} req/s"
+          f"  読み込み {len(reads):6}件 (p95 {p95(reads):7.1f}ms)"
+          f"  書き込み {len(writes):5}件 (p95 {p95(writes):7.1f}ms)"
+          f"  エラー {errors}件")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLiteの設定のプロファイルごとに req/s を比べる')
+    parser.add_argument('--serve', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    parser.add_argument('--profiles', default=None,
+                        help='比べるプロファイル（カンマ区切り。省略時はすべて）')
+    parser.add_argument('--clients', type=int, default=16, help='同時にリクエストを送るスレッドの数')
+    parser.add_argument('--writes', type=float, default=0.2, help='リクエストのうち書き込みの割合')
+    parser.add_argument('--duration', type=float, default=10, help='プロファイルごとの計測時間（秒）')
+    parser.add_argument('--users', type=int, default=1000, help='最初に入れるユーザー数')
+    parser.add_argument('--posts', type=int, default=100_000, help='最初に入れる投稿数')
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    if args.profiles:
+        profiles = args.profiles.split(',')
+    else:
+        # SQLITE_PROFILES を読むためだけに読み込む（データベースはメモリ上のものにする）
+        os.environ.setdefault('DATABASE_URL', 'sqlite://')
+        from database_example import SQLITE_PROFILES
+
+        profiles = list(SQLITE_PROFILES)
+    print(f"{args.clients}クライアント・書き込み {args.writes:.0%}・{args.duration:g}秒ずつ"
+          f"（{args.posts:,}投稿）\n")
+    for profile in profiles:
+        summarize(profile, benchmark_profile(profile, args), args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+database_example.py の各ページが発行するSQLの数を確認するスクリプト
+
+メモリ上のSQLiteに、少ないデータと多いデータをそれぞれ入れてページを表示し、
+1ページあたりのSQLの数が行数によって変わらないこと（N+1問題がないこと）を確かめる。
+行数によって数が変わるページがあれば終了コード 1 で終わる。
+
+使い方:
+    python check_query_count.py               # 3ユーザー・5投稿 と 50ユーザー・500投稿 で比べる
+    python check_query_count.py --sizes 10,1000 -v   # 発行したSQLも表示する
+"""
+
+import argparse
+import os
+import sys
+
+# database_example を読み込む前に、メモリ上のデータベースに切り替える
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from sqlalchemy import event
+
+from database_example import Post, Tag, User, app, db
+
+# 確認するページ（URL）
+PAGES = ['/', '/users', '/user/1', '/post/1', '/tag/tag1', '/api/posts', '/api/users']
+
+
+def seed(users, posts):
+    """データベースを作り直し、users 人のユーザーと posts 件の投稿（タグ付き）を入れる"""
+    db.drop_all()
+    db.create_all()
+    db.session.add_all(User(username=f'user{i}', email=f'user{i}@example.com')
+                       for i in range(1, users + 1))
+    db.session.flush()
+    tags = [Tag(name=f'tag{i}') for i in range(1, 4)]
+    db.session.add_all(Post(title=f'投稿{i}', content='本文' * 20, user_id=i % users + 1,
+                            tags=tags[:i % 3 + 1])
+                       for i in range(posts))
+    db.session.commit()
+
+
+def count_queries(client, url):
+    """url を表示したときに発行されたSQLのリストを返す"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} が {response.status_code} を返しました")
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ページごとのSQLの数が行数によって変わらないか確認する')
+    parser.add_argument('--sizes', default='5,500',
+                        help='比べる投稿数（カンマ区切り。ユーザー数は投稿数の1/10、最低3人）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='発行したSQLも表示する')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    counts = {}
+    with app.app_context():
+        client = app.test_client()
+        for posts in sizes:
+            seed(max(3, posts // 10), posts)
+            for url in PAGES:
+                statements = count_queries(client, url)
+                counts.setdefault(url, []).append(len(statements))
+                if args.verbose:
+                    print(f"--- {url}（{posts}投稿）")
+                    for statement in statements:
+                        print(' '.join(statement.split()))
+
+    failed = 0
+    for url, page_counts in counts.items():
+        fixed = len(set(page_counts)) == 1
+        failed += not fixed
+        detail = ', '.join(f'{posts}投稿: {count}回' for posts, count in zip(sizes, page_counts))
+        print(f"{'OK  ' if fixed else 'NG  '}{url:10} {detail}")
+    if failed:
+        print(f"\n{failed}ページで、行数によってSQLの数が変わりました（N+1問題）。")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
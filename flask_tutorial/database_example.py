@@ -1,19 +1,69 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import event, tuple_
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import joinedload, selectinload
+from datetime import datetime, timedelta
+import click
 import os
+import random
+import time
 
 app = Flask(__name__)
 
 # データベース設定
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "instance", "blog.db")}'
+os.makedirs(os.path.join(basedir, 'instance'), exist_ok=True)
+# 環境変数 DATABASE_URL で別のデータベースを使える（確認用のスクリプトではメモリ上のSQLite）
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', f'sqlite:///{os.path.join(basedir, "instance", "blog.db")}'
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
+# SQLiteの設定のプロファイル（環境変数 SQLITE_PROFILE で選ぶ。接続するたびに PRAGMA で設定する）
+#   default     SQLiteの既定のまま（書き込み中は読み込みも待たされる）
+#   production  WAL（書き込み中も読み込める）・同期を減らす・メモリマップとキャッシュを大きくする・
+#               ロック中は最大5秒待つ（すぐに "database is locked" にしない）
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        # WAL では NORMAL でもデータベースは壊れない（電源断で直前のコミットが消えることはある）
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+    },
+}
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+if app.config['SQLITE_PROFILE'] not in SQLITE_PROFILES:
+    raise ValueError(f"SQLITE_PROFILE は {', '.join(SQLITE_PROFILES)} のどれかにしてください")
+
+# マルチスレッドのサーバーで同時に使う接続の数（リクエストを処理するスレッドの数に合わせる）
+# メモリ上のSQLite（sqlite:// や sqlite:///:memory:）は Flask-SQLAlchemy が StaticPool の
+# 1つの接続を使い回すので、ファイルのデータベースのときだけ設定する
+database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if database_url.get_backend_name() == 'sqlite' and database_url.database not in (None, '', ':memory:'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 10,
+    }
+
 # データベースの初期化
 db = SQLAlchemy(app)
 
+def apply_sqlite_profile(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PROFILES[app.config['SQLITE_PROFILE']].items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', apply_sqlite_profile)
+
 # モデルの定義
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -32,6 +82,14 @@ class Post(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    tags = db.relationship('Tag', secondary='post_tags', backref='posts', lazy=True)
+
+    # 投稿一覧とユーザーごとの投稿一覧のページ分け（created_at, id の順）をインデックスだけで辿れるようにする
+    # （既存のデータベースには MIGRATIONS で追加する）
+    __table_args__ = (
+        db.Index('ix_post_created_at_id', 'created_at', 'id'),
+        db.Index('ix_post_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
     
     def __repr__(self):
         return f'<Post {self.title}>'
@@ -46,28 +104,185 @@ class Tag(db.Model):
 # 多対多の関係のための中間テーブル
 post_tags = db.Table('post_tags',
     db.Column('post_id', db.Integer, db.ForeignKey('post.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True),
+    # 主キーは post_id が先なので、タグから投稿を引くときのためのインデックス
+    db.Index('ix_post_tags_tag_id_post_id', 'tag_id', 'post_id')
 )
 
+# スキーマの変更（マイグレーション）
+# create_all() は既にあるテーブルを変更しないので、前からあるデータベースに足すインデックスなどは
+# ここに順番に追加する（新しいデータベースでは何もしない書き方にする）。
+# 適用済みの番号は SQLite の PRAGMA user_version に記録する
+MIGRATIONS = [
+    # 1: 投稿一覧（作成日時の順）と、ユーザーごとの投稿一覧のインデックス
+    [
+        'CREATE INDEX IF NOT EXISTS ix_post_created_at_id ON post (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_post_user_id_created_at_id ON post (user_id, created_at, id)',
+    ],
+    # 2: タグから投稿を引くインデックス
+    [
+        'CREATE INDEX IF NOT EXISTS ix_post_tags_tag_id_post_id ON post_tags (tag_id, post_id)',
+    ],
+]
+
+def schema_version(connection):
+    return connection.exec_driver_sql('PRAGMA user_version').scalar()
+
+def migrate(engine=None):
+    """まだ適用していないマイグレーションを順に適用し、(適用前のバージョン, 適用後のバージョン) を返す
+
+    バージョンの記録に PRAGMA user_version を使うので SQLite 専用。ほかのデータベースでは何もせず
+    (None, None) を返す（新しいデータベースなら create_all() がインデックスも作る）。
+    """
+    engine = engine or db.engine
+    if engine.dialect.name != 'sqlite':
+        app.logger.warning('%s のデータベースにはマイグレーションを適用しません（SQLite 専用）',
+                           engine.dialect.name)
+        return None, None
+    with engine.begin() as connection:
+        current = schema_version(connection)
+        for version, statements in enumerate(MIGRATIONS[current:], start=current + 1):
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+            connection.exec_driver_sql(f'PRAGMA user_version = {version}')
+        return current, schema_version(connection)
+
 # データベースの作成
 with app.app_context():
     db.create_all()
+    migrate()
+
+# 一覧・詳細ページのクエリ
+# テンプレートで post.author や user.posts に触れると、行ごとにSELECTが発行される（N+1問題）ので、
+# 使う関連はここでまとめて読み込んでおく
+def posts_with_authors(*criteria):
+    """投稿を新しい順に、投稿者とタグを一緒に読み込むクエリ（同じ日時なら id の大きい順）
+
+    投稿者はJOINで、タグはページの投稿の id をまとめた IN (...) の1回のクエリで読み込む。
+    """
+    return (Post.query.options(joinedload(Post.author), selectinload(Post.tags))
+            .filter(*criteria)
+            .order_by(Post.created_at.desc(), Post.id.desc()))
+
+def users_with_post_counts():
+    """(ユーザー, 投稿数) のクエリ（投稿数は COUNT ... GROUP BY の1回のクエリで数える）"""
+    return (db.session.query(User, db.func.count(Post.id).label('post_count'))
+            .outerjoin(User.posts)
+            .group_by(User.id)
+            .order_by(User.id))
+
+# ページ分け（キーセット方式）
+# OFFSET は読み飛ばす行もすべて辿るので後ろのページほど遅くなる。代わりに、前のページの最後の行の
+# キー（?after=）より後ろの行をインデックスから PER_PAGE 件だけ読むので、どのページも同じ速さになる
+PER_PAGE = 20
+
+def post_cursor(post):
+    """投稿一覧の ?after= に使う文字列（作成日時と id）"""
+    return f'{post.created_at.isoformat()}_{post.id}'
+
+def parse_post_cursor(cursor):
+    try:
+        created_at, post_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except ValueError:
+        abort(400, description='after の形式が正しくありません')
+
+def parse_id_cursor(cursor):
+    try:
+        return int(cursor)
+    except ValueError:
+        abort(400, description='after の形式が正しくありません')
+
+def keyset_page(query):
+    """1件多く読んで、(このページの行, 次のページがあるか) を返す"""
+    rows = query.limit(PER_PAGE + 1).all()
+    return rows[:PER_PAGE], len(rows) > PER_PAGE
+
+def post_page(query, after=None):
+    """posts_with_authors() のクエリの1ページ分と、次のページの ?after=（最後のページなら None）"""
+    if after:
+        created_at, post_id = parse_post_cursor(after)
+        query = query.filter(tuple_(Post.created_at, Post.id) < (created_at, post_id))
+    posts, has_next = keyset_page(query)
+    return posts, post_cursor(posts[-1]) if has_next else None
+
+def user_page(after=None):
+    """(ユーザー, 投稿数) の1ページ分と、次のページの ?after=（最後のページなら None）"""
+    query = users_with_post_counts()
+    if after:
+        query = query.filter(User.id > parse_id_cursor(after))
+    rows, has_next = keyset_page(query)
+    return rows, str(rows[-1][0].id) if has_next else None
+
+def tag_post_page(tag, after=None):
+    """タグの付いた投稿の1ページ分と、次のページの ?after=（新しい投稿、つまり id の大きい順）
+
+    post_tags の (tag_id, post_id) のインデックスを後ろから辿るので、タグの付いた投稿がいくら多くても
+    PER_PAGE 件だけ読めばよい（作成日時の順にすると、タグの付いた投稿をすべて読んで並べ替えることになる）。
+    """
+    # tag_detail.html は投稿のタグを表示しないので、タグは読み込まない
+    query = (Post.query.options(joinedload(Post.author))
+             .join(post_tags, post_tags.c.post_id == Post.id)
+             .filter(post_tags.c.tag_id == tag.id)
+             .order_by(post_tags.c.post_id.desc()))
+    if after:
+        query = query.filter(post_tags.c.post_id < parse_id_cursor(after))
+    posts, has_next = keyset_page(query)
+    return posts, str(posts[-1].id) if has_next else None
 
 # ルート定義
 @app.route('/')
 def index():
-    posts = Post.query.order_by(Post.created_at.desc()).all()
-    return render_template('db/index.html', posts=posts)
+    posts, next_cursor = post_page(posts_with_authors(), request.args.get('after'))
+    return render_template('db/index.html', posts=posts, next_cursor=next_cursor)
 
 @app.route('/users')
 def users():
-    all_users = User.query.all()
-    return render_template('db/users.html', users=all_users)
+    page_users, next_cursor = user_page(request.args.get('after'))
+    return render_template('db/users.html', users=page_users, next_cursor=next_cursor)
+
+# 一覧のJSON版（next を ?after= に渡すと次のページ）
+@app.route('/api/posts')
+def api_posts():
+    posts, next_cursor = post_page(posts_with_authors(), request.args.get('after'))
+    return jsonify({
+        'posts': [{
+            'id': post.id,
+            'title': post.title,
+            'created_at': post.created_at.isoformat(),
+            'author': {'id': post.author.id, 'username': post.author.username},
+            'tags': [tag.name for tag in post.tags],
+        } for post in posts],
+        'next': next_cursor,
+    })
+
+@app.route('/api/users')
+def api_users():
+    page_users, next_cursor = user_page(request.args.get('after'))
+    return jsonify({
+        'users': [{
+            'id': user.id,
+            'username': user.username,
+            'created_at': user.created_at.isoformat(),
+            'post_count': post_count,
+        } for user, post_count in page_users],
+        'next': next_cursor,
+    })
 
 @app.route('/user/<int:user_id>')
 def user_detail(user_id):
-    user = User.query.get_or_404(user_id)
-    return render_template('db/user_detail.html', user=user)
+    user = db.get_or_404(User, user_id)
+    posts, next_cursor = post_page(posts_with_authors(Post.user_id == user.id), request.args.get('after'))
+    post_count = db.session.query(db.func.count(Post.id)).filter(Post.user_id == user.id).scalar()
+    return render_template('db/user_detail.html', user=user, posts=posts, post_count=post_count,
+                           next_cursor=next_cursor)
+
+# タグ名はフォームの自由入力なので、"CI/CD" のように / を含むものも受け付ける
+@app.route('/tag/<path:name>')
+def tag_detail(name):
+    tag = Tag.query.filter_by(name=name).first_or_404()
+    posts, next_cursor = tag_post_page(tag, request.args.get('after'))
+    return render_template('db/tag_detail.html', tag=tag, posts=posts, next_cursor=next_cursor)
 
 @app.route('/add_user', methods=['GET', 'POST'])
 def add_user():
@@ -91,6 +306,12 @@ def add_user():
     
     return render_template('db/add_user.html')
 
+def tags_from_form(text):
+    """カンマ区切りのタグ名を Tag のリストにする（ないタグは作る）"""
+    names = list(dict.fromkeys(name.strip() for name in text.split(',') if name.strip()))
+    existing = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names))} if names else {}
+    return [existing.get(name) or Tag(name=name) for name in names]
+
 @app.route('/add_post', methods=['GET', 'POST'])
 def add_post():
     if request.method == 'POST':
@@ -98,7 +319,8 @@ def add_post():
         content = request.form['content']
         user_id = request.form['user_id']
         
-        new_post = Post(title=title, content=content, user_id=user_id)
+        new_post = Post(title=title, content=content, user_id=user_id,
+                        tags=tags_from_form(request.form.get('tags', '')))
         db.session.add(new_post)
         db.session.commit()
         
@@ -110,7 +332,7 @@ def add_post():
 
 @app.route('/post/<int:post_id>')
 def post_detail(post_id):
-    post = Post.query.get_or_404(post_id)
+    post = posts_with_authors(Post.id == post_id).first_or_404()
     return render_template('db/post_detail.html', post=post)
 
 @app.route('/edit_post/<int:post_id>', methods=['GET', 'POST'])
@@ -120,6 +342,7 @@ def edit_post(post_id):
     if request.method == 'POST':
         post.title = request.form['title']
         post.content = request.form['content']
+        post.tags = tags_from_form(request.form.get('tags', ''))
         db.session.commit()
         
         flash('投稿が更新されました', 'success')
@@ -136,50 +359,186 @@ def delete_post(post_id):
     flash('投稿が削除されました', 'info')
     return redirect(url_for('index'))
 
+# ナビゲーション（base.html の About・お問い合わせのページはこのアプリにはない）
+@app.context_processor
+def inject_nav_links():
+    return {'nav_links': [('index', '投稿一覧'), ('users', 'ユーザー一覧')]}
+
 # カスタムフィルター
 @app.template_filter('datetime')
 def datetime_filter(datetime_obj):
     return datetime_obj.strftime('%Y年%m月%d日 %H:%M')
 
 # サンプルデータの投入
-@app.route('/init_db')
-def init_db():
-    # 既存のデータをクリア
+def reset_database():
+    """テーブルを作り直して空にする"""
     db.drop_all()
     db.create_all()
-    
-    # サンプルユーザーの作成
+
+def insert_sample_data():
+    """チュートリアル用の少しのサンプルデータを入れる"""
     users = [
         User(username='tanaka', email='tanaka@example.com'),
         User(username='yamada', email='yamada@example.com'),
         User(username='suzuki', email='suzuki@example.com')
     ]
-    
-    for user in users:
-        db.session.add(user)
-    
-    db.session.commit()
-    
-    # サンプル投稿の作成
-    posts = [
+    db.session.add_all(users)
+    db.session.flush()
+
+    flask_tag = Tag(name='Flask')
+    db.session.add_all([
         Post(title='Flaskを始めました', 
              content='今日からFlaskの勉強を始めました。とても楽しいです！', 
-             user_id=1),
+             author=users[0], tags=[flask_tag]),
         Post(title='データベース連携', 
              content='SQLAlchemyを使ってデータベースと連携する方法を学びました。', 
-             user_id=1),
+             author=users[0], tags=[flask_tag, Tag(name='SQLAlchemy')]),
         Post(title='初めての投稿', 
              content='はじめまして。よろしくお願いします。', 
-             user_id=2)
-    ]
-    
-    for post in posts:
-        db.session.add(post)
-    
+             author=users[1], tags=[Tag(name='雑記')])
+    ])
     db.session.commit()
-    
+
+@app.route('/init_db')
+def init_db():
+    reset_database()
+    insert_sample_data()
     flash('サンプルデータが投入されました', 'success')
     return redirect(url_for('index'))
 
+# 負荷試験用の大量データの投入（flask --app database_example seed --users 10000 --posts 1000000）
+# 1行ずつ db.session.add() すると、行ごとにORMのオブジェクトとSQLの発行が必要になって遅いので、
+# 行をタプルのまま SEED_BATCH_SIZE 件ずつ executemany で1つのトランザクションに入れる
+SEED_BATCH_SIZE = 50_000
+
+# 大量に書き込む間だけ使うSQLiteの設定（途中で落ちたらデータベースが壊れてもよい前提）
+BULK_LOAD_PRAGMAS = {
+    'journal_mode': 'OFF',
+    'synchronous': 'OFF',
+    'cache_size': -256 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def insert_rows(connection, table, columns, rows):
+    """rows（columns の順のタプル）を SEED_BATCH_SIZE 件ずつ executemany で入れ、件数を返す"""
+    sql = str(table.insert().compile(dialect=connection.dialect, column_keys=columns))
+    if not connection.dialect.positional:
+        rows = (dict(zip(columns, row)) for row in rows)
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= SEED_BATCH_SIZE:
+            connection.exec_driver_sql(sql, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        connection.exec_driver_sql(sql, batch)
+        count += len(batch)
+    return count
+
+def bulk_seed(users, posts, tags=50, max_tags_per_post=3, seed=None):
+    """ユーザー・投稿・タグを一括で追加し、{テーブル名: 件数} を返す
+
+    id はこちらで振るので、投稿とタグの関連（post_tags）も読み直さずに作れる。
+    投稿の作成日時は、1年前から今までの間に古い順に並べる。
+    投稿が1件もなければ、投稿のインデックスは全部入れてからまとめて作る（1行ずつ更新するより速い）。
+    users が 0 なら、投稿者は今いるユーザーから選ぶ（1人もいなければ ValueError）。
+    """
+    rng = random.Random(seed)
+    counts = {}
+    with db.engine.connect() as connection:
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            # journal_mode はトランザクションの外でしか変えられない
+            saved = {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                     for name in BULK_LOAD_PRAGMAS}
+            for name, value in BULK_LOAD_PRAGMAS.items():
+                connection.exec_driver_sql(f'PRAGMA {name} = {value}')
+            connection.commit()
+        try:
+            with connection.begin():
+                def next_id(model):
+                    return (connection.execute(db.select(db.func.max(model.id))).scalar() or 0) + 1
+
+                first_user, first_post, first_tag = next_id(User), next_id(Post), next_id(Tag)
+                user_ids = range(first_user, first_user + users)
+                author_ids = list(user_ids) or connection.execute(db.select(User.id)).scalars().all()
+                if posts and not author_ids:
+                    raise ValueError('投稿者になるユーザーがいません（users を1以上にしてください）')
+
+                deferred = list(Post.__table__.indexes | post_tags.indexes) if first_post == 1 else []
+                for index in deferred:
+                    index.drop(connection, checkfirst=True)
+
+                post_ids = range(first_post, first_post + posts)
+                now = datetime.utcnow()
+                start = now - timedelta(days=365)
+                step = (now - start) / max(posts, 1)
+                if sqlite:
+                    # SQLAlchemy が SQLite に保存する形式の文字列にしておき、行ごとの変換を省く
+                    def timestamp(value):
+                        return value.isoformat(' ', 'microseconds')
+                else:
+                    def timestamp(value):
+                        return value
+
+                counts['user'] = insert_rows(connection, User.__table__, ['id', 'username', 'email', 'created_at'], (
+                    (i, f'user{i}', f'user{i}@example.com', timestamp(start)) for i in user_ids
+                ))
+                counts['tag'] = insert_rows(connection, Tag.__table__, ['id', 'name'], (
+                    (i, f'tag{i}') for i in range(first_tag, first_tag + tags)
+                ))
+                counts['post'] = insert_rows(
+                    connection, Post.__table__, ['id', 'title', 'content', 'created_at', 'updated_at', 'user_id'],
+                    ((post_id, f'投稿{post_id}', f'負荷試験用の投稿{post_id}です。', created_at, created_at,
+                      author_ids[int(rng.random() * len(author_ids))])
+                     for n, post_id in enumerate(post_ids)
+                     for created_at in [timestamp(start + step * n)])
+                )
+                # 投稿ごとに 0〜max_tags_per_post 個の、番号の続いたタグを付ける（重ならない）
+                counts['post_tags'] = insert_rows(connection, post_tags, ['post_id', 'tag_id'], (
+                    (post_id, first_tag + (offset + k) % tags)
+                    for post_id in post_ids
+                    for offset in [int(rng.random() * tags)]
+                    for k in range(min(int(rng.random() * (max_tags_per_post + 1)), tags))
+                ))
+
+                for index in deferred:
+                    index.create(connection)
+        finally:
+            if sqlite:
+                for name, value in saved.items():
+                    connection.exec_driver_sql(f'PRAGMA {name} = {value}')
+                connection.commit()
+    return counts
+
+@app.cli.command('seed')
+@click.option('--users', default=1000, show_default=True, type=click.IntRange(min=0),
+              help='追加するユーザー数（0なら投稿者は今いるユーザーから選ぶ）')
+@click.option('--posts', default=100_000, show_default=True, type=click.IntRange(min=0), help='追加する投稿数')
+@click.option('--tags', default=50, show_default=True, type=click.IntRange(min=0), help='追加するタグの数')
+@click.option('--reset', is_flag=True, help='先にテーブルを作り直して空にする')
+@click.option('--sample', is_flag=True, help='チュートリアル用のサンプルデータだけを入れる（/init_db と同じ）')
+@click.option('--seed', 'random_seed', type=int, default=None, help='乱数のシード（同じデータを作り直すとき）')
+def seed_command(users, posts, tags, reset, sample, random_seed):
+    """負荷試験用のユーザー・投稿・タグを一括で追加する"""
+    if reset or sample:
+        reset_database()
+    if sample:
+        insert_sample_data()
+        click.echo('サンプルデータを投入しました。')
+        return
+    started = time.perf_counter()
+    try:
+        counts = bulk_seed(users, posts, tags, seed=random_seed)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    click.echo(', '.join(f'{table}: {count:,}件' for table, count in counts.items()))
+    click.echo(f'{total:,}行を {elapsed:.1f}秒で追加しました（{total / elapsed:,.0f}行/秒）。')
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Markdownの変換エンジン（バックエンド）
+
+    markdown     Python-Markdown（既定。tutorials.toml の拡張機能をそのまま使う）
+    markdown-it  markdown-it-py（CommonMark準拠で速い。pip install markdown-it-py mdit-py-plugins）
+
+どちらも同じ形の変換器（convert() と headings()）を返すので、build_tutorials.py は
+tutorials.toml のテンプレートの backend か --backend で選んだものをそのまま使う。
+
+markdown-it では、Python-Markdown の拡張機能のうちチュートリアルで使うもの
+（toc の見出しidと anchorlink・codehilite・tables・nl2br・attr_list の見出しid・
+footnotes・def_list・asset_store）を同じHTMLになるように再現する。
+ほかの拡張機能（abbr など）と [TOC] は再現しないので、unsupported_extensions() で確認できる。
+リストの字下げなど CommonMark と Python-Markdown で解釈が違う書き方もあるので、
+切り替える前に check_backend_parity.py で出力の差を確認すること。
+
+使い方:
+    python markdown_backends.py               # 使えるバックエンドの一覧
+"""
+
+import html
+import importlib.util
+import os
+import re
+
+DEFAULT_BACKEND = 'markdown'
+
+# markdown-it で再現する Python-Markdown の拡張機能
+MARKDOWN_IT_EXTENSIONS = {
+    'toc', 'codehilite', 'fenced_code', 'tables', 'nl2br', 'attr_list',
+    'footnotes', 'def_list', 'asset_store',
+}
+
+# 空白だけの行（Python-Markdown は変換前に空行にする）
+BLANK_LINE_RE = re.compile(r'(?<=\n) +\n')
+# 見出しの末尾の {#id} / {: #id }（attr_list）
+HEADING_ATTR_RE = re.compile(r'\s*\{:?\s*#([^\s}]+)\s*\}\s*$')
+
+
+def extension_name(extension):
+    """'markdown.extensions.toc' のような指定も 'toc' にそろえる"""
+    return extension.rsplit('.', 1)[-1]
+
+
+def flatten_toc_tokens(tokens):
+    """入れ子になった toc_tokens を文書順の平らなリストにする"""
+    flat = []
+    for token in tokens:
+        children = token.get('children', [])
+        flat.append({key: value for key, value in token.items() if key != 'children'})
+        flat.extend(flatten_toc_tokens(children))
+    return flat
+
+
+class PythonMarkdownConverter:
+    """Python-Markdown による変換器（markdown.Markdown を reset() して使い回す）"""
+
+    name = 'markdown'
+    # 変換結果に影響するパッケージ（ビルドキャッシュのキーに入れるバージョン）
+    distributions = ('Markdown',)
+
+    def __init__(self, extensions, extension_configs):
+        import markdown
+
+        self.md = markdown.Markdown(extensions=extensions, extension_configs=extension_configs)
+
+    def convert(self, text):
+        self.md.reset()
+        return self.md.convert(text)
+
+    def headings(self):
+        """直前に変換した文書の見出しの情報
+
+        toc拡張機能が自動で付けたidなら 'slug' に元のスラッグを、{#id} で明示された
+        idなら None を入れる（セクションごとに変換したidを振り直すときに使う）。
+        """
+        from markdown.extensions.toc import unique
+
+        toc = self.md.treeprocessors['toc'] if 'toc' in self.md.treeprocessors else None
+        if toc is None:
+            return []
+        local_ids = set()
+        headings = []
+        for token in flatten_toc_tokens(self.md.toc_tokens):
+            slug = toc.slugify(html.unescape(token['name']), toc.sep)
+            if unique(slug, set(local_ids)) == token['id']:
+                token['slug'] = slug
+            else:
+                token['slug'] = None
+            local_ids.add(token['id'])
+            headings.append(token)
+        return headings
+
+
+class MarkdownItConverter:
+    """markdown-it-py による変換器（出力は Python-Markdown にできるだけ合わせる）"""
+
+    name = 'markdown-it'
+    distributions = ('markdown-it-py', 'mdit-py-plugins')
+
+    def __init__(self, extensions, extension_configs):
+        from markdown_it import MarkdownIt
+
+        names = {extension_name(extension) for extension in extensions}
+        configs = {extension_name(key): value for key, value in extension_configs.items()}
+        self.toc = None
+        if 'toc' in names:
+            self.toc = self._toc_config(configs.get('toc', {}))
+        self.codehilite = None
+        if 'codehilite' in names:
+            self.codehilite = self._codehilite_config(configs.get('codehilite', {}))
+        self.attr_list = 'attr_list' in names
+        self.asset_store = 'asset_store' in names
+        self._headings = []
+
+        self.md = MarkdownIt('commonmark', {
+            'html': True,
+            'xhtmlOut': True,
+            'breaks': 'nl2br' in names,
+        })
+        # Python-Markdown はリンク先をパーセントエンコードしない
+        self.md.normalizeLink = lambda url: url
+        if 'tables' in names:
+            self.md.enable('table')
+        if 'footnotes' in names:
+            from mdit_py_plugins.footnote import footnote_plugin
+            self.md.use(footnote_plugin)
+        if 'def_list' in names:
+            from mdit_py_plugins.deflist import deflist_plugin
+            self.md.use(deflist_plugin)
+
+        if self.attr_list:
+            self.md.core.ruler.before('inline', 'heading_attrs', self._heading_attrs)
+        if self.toc is not None:
+            self.md.core.ruler.push('heading_ids', self._heading_ids)
+            self._add_render_rule('heading_open', self._render_heading_open)
+            self._add_render_rule('heading_close', self._render_heading_close)
+        if self.codehilite is not None:
+            self._add_render_rule('fence', self._render_fence)
+            self._add_render_rule('code_block', self._render_code_block)
+        if self.asset_store:
+            self._add_render_rule('image', self._render_image)
+        # Python-Markdown は本文の " をエスケープしない
+        self._add_render_rule('text', self._render_text)
+        self._add_render_rule('code_inline', self._render_code_inline)
+        self._add_render_rule('ordered_list_open', self._render_ordered_list_open)
+        self._add_render_rule('th_open', self._render_cell_open)
+        self._add_render_rule('td_open', self._render_cell_open)
+
+    def _add_render_rule(self, name, method):
+        # add_render_rule は関数をレンダラーのメソッドにするので、関数で包んで渡す
+        self.md.add_render_rule(name, lambda renderer, *args: method(renderer, *args))
+
+    @staticmethod
+    def _toc_config(config):
+        from markdown.extensions.toc import TocExtension
+
+        return TocExtension(**config).getConfigs()
+
+    @staticmethod
+    def _codehilite_config(config):
+        from markdown.extensions.codehilite import CodeHiliteExtension
+
+        return CodeHiliteExtension(**config).getConfigs()
+
+    def convert(self, text):
+        # Python-Markdown の前処理（改行・タブ・空白だけの行）に合わせる
+        text = text.replace('\r\n', '\n').replace('\r', '\n') + '\n\n'
+        text = BLANK_LINE_RE.sub('\n', text.expandtabs(4))
+        env = {}
+        # Python-Markdown と同じく、前後の空白を除いた結果を返す
+        output = self.md.render(text, env).strip()
+        self._headings = env.get('headings', [])
+        return output
+
+    def headings(self):
+        return [dict(heading) for heading in self._headings]
+
+    # 見出しのid（toc・attr_list）
+
+    def _heading_attrs(self, state):
+        for index, token in enumerate(state.tokens):
+            if token.type != 'heading_open':
+                continue
+            inline = state.tokens[index + 1]
+            match = HEADING_ATTR_RE.search(inline.content)
+            if match:
+                inline.content = inline.content[:match.start()]
+                token.attrSet('id', match.group(1))
+
+    def _heading_ids(self, state):
+        from markdown.extensions.toc import unique
+
+        headings = [(token, state.tokens[index + 1])
+                    for index, token in enumerate(state.tokens) if token.type == 'heading_open']
+        # 明示されたidを先に予約する（toc拡張機能と同じ順）
+        used_ids = {token.attrGet('id') for token, _ in headings if token.attrGet('id')}
+        records = []
+        for token, inline in headings:
+            text = ''.join(child.content for child in inline.children or []
+                           if child.type in ('text', 'code_inline'))
+            slug = self.toc['slugify'](text, self.toc['separator'])
+            if token.attrGet('id'):
+                token_id, token_slug = token.attrGet('id'), None
+            else:
+                token_id, token_slug = unique(slug, used_ids), slug
+                token.attrSet('id', token_id)
+            records.append({
+                'level': int(token.tag[1]),
+                'id': token_id,
+                'name': html.escape(text, quote=False),
+                'html': self.md.renderer.renderInline(inline.children or [], self.md.options, state.env),
+                'data-toc-label': '',
+                'slug': token_slug,
+            })
+        state.env['headings'] = records
+
+    def _render_heading_open(self, renderer, tokens, index, options, env):
+        token = tokens[index]
+        output = renderer.renderToken(tokens, index, options, env)
+        if self.toc['anchorlink']:
+            output += f'<a class="toclink" href="#{token.attrGet("id")}">'
+        return output
+
+    def _render_heading_close(self, renderer, tokens, index, options, env):
+        output = renderer.renderToken(tokens, index, options, env)
+        if self.toc['anchorlink']:
+            output = '</a>' + output
+        return output
+
+    # コードブロック（codehilite）
+
+    def _hilite(self, code, lang, shebang):
+        # build_tutorials.py のハイライトのキャッシュも効くように、codehilite と同じ CodeHilite を使う
+        from markdown.extensions.codehilite import CodeHilite
+
+        config = dict(self.codehilite)
+        return CodeHilite(code, lang=lang or None,
+                          style=config.pop('pygments_style', 'default'), **config).hilite(shebang)
+
+    def _render_fence(self, renderer, tokens, index, options, env):
+        token = tokens[index]
+        lang = token.info.strip().split(maxsplit=1)[0] if token.info.strip() else None
+        return self._hilite(token.content, lang, shebang=False) + '\n'
+
+    def _render_code_block(self, renderer, tokens, index, options, env):
+        return self._hilite(tokens[index].content, None, shebang=True) + '\n'
+
+    # 画像（asset_store）
+
+    def _render_image(self, renderer, tokens, index, options, env):
+        import asset_store
+
+        token = tokens[index]
+        src = token.attrGet('src') or ''
+        alt = renderer.renderInlineAsText(token.children or [], options, env)
+        local = os.path.join(asset_store.BASE_DIR, src)
+        if '://' in src or src.startswith(('/', 'data:')) or not os.path.isfile(local):
+            token.attrSet('alt', alt)
+            token.attrSet('loading', 'lazy')
+            return '<img' + renderer.renderAttrs(token) + ' />'
+        return asset_store.image_html(asset_store.store_file(local), alt)
+
+    # エスケープと表のそろえ方を Python-Markdown に合わせる
+
+    def _render_text(self, renderer, tokens, index, options, env):
+        return html.escape(tokens[index].content, quote=False)
+
+    def _render_code_inline(self, renderer, tokens, index, options, env):
+        return '<code>' + html.escape(tokens[index].content, quote=False) + '</code>'
+
+    def _render_ordered_list_open(self, renderer, tokens, index, options, env):
+        # Python-Markdown は番号付きリストの開始番号を使わない
+        return '<ol>\n'
+
+    def _render_cell_open(self, renderer, tokens, index, options, env):
+        token = tokens[index]
+        style = token.attrGet('style')
+        if style:
+            token.attrSet('style', style.replace(':', ': ') + ';')
+        return renderer.renderToken(tokens, index, options, env)
+
+
+BACKENDS = {
+    PythonMarkdownConverter.name: (PythonMarkdownConverter, 'markdown'),
+    MarkdownItConverter.name: (MarkdownItConverter, 'markdown_it'),
+}
+
+
+def available_backends():
+    """インストールされていて使えるバックエンドの名前"""
+    return [name for name, (_, module) in BACKENDS.items()
+            if importlib.util.find_spec(module) is not None]
+
+
+def unsupported_extensions(backend, extensions):
+    """backend では再現されない拡張機能"""
+    if backend == PythonMarkdownConverter.name:
+        return []
+    return [extension for extension in extensions
+            if extension_name(extension) not in MARKDOWN_IT_EXTENSIONS]
+
+
+def create_converter(backend, extensions, extension_configs):
+    """backend の変換器を作る"""
+    if backend not in BACKENDS:
+        raise ValueError(f"不明なMarkdownのバックエンドです: {backend}（{', '.join(BACKENDS)} のどれか）")
+    converter_class, module = BACKENDS[backend]
+    if importlib.util.find_spec(module) is None:
+        raise RuntimeError(f"バックエンド {backend} を使うには {module} が必要です"
+                           f"（pip install markdown-it-py mdit-py-plugins）")
+    return converter_class(extensions, extension_configs)
+
+
+def main():
+    available = available_backends()
+    for name in BACKENDS:
+        mark = '使用可' if name in available else '未インストール'
+        default = '（既定）' if name == DEFAULT_BACKEND else ''
+        print(f"{name:<12} {mark}{default}")
+
+
+if __name__ == "__main__":
+    main()
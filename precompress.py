@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+生成したHTML/CSS/JSの圧縮済みファイル（.gz と .br）を作るスクリプト
+
+静的ファイルサーバーが Content-Encoding に合わせてそのまま返せるように、
+最大圧縮率で圧縮したファイルを元のファイルの隣に書き出す。
+内容のハッシュを .build_cache/ に記録し、変わったファイルと、元のファイルより古くなった
+圧縮済みファイルだけを圧縮し直す（serve_tutorials.py も更新日時で同じように古いものを配信しない）。
+
+brotli パッケージがない場合は .gz だけを作る（pip install brotli）。
+
+使い方:
+    python precompress.py                     # 生成済みのHTML（章ごとのページも）・assets/・search/ を圧縮
+    python precompress.py index.html
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(BASE_DIR, '.build_cache', 'compressed.json')
+CHUNK_SIZE = 64 * 1024
+
+
+def gzip_stream(src, dst):
+    """gzipで圧縮しながら書き出す"""
+    # mtime=0 とファイル名なしで、同じ内容なら同じ .gz になるようにする
+    with gzip.GzipFile(filename='', mode='wb', fileobj=dst, compresslevel=9, mtime=0) as gz:
+        shutil.copyfileobj(src, gz, CHUNK_SIZE)
+
+
+def brotli_stream(src, dst):
+    """brotliで圧縮しながら書き出す"""
+    compressor = brotli.Compressor(quality=11, mode=brotli.MODE_TEXT)
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        dst.write(compressor.process(chunk))
+    dst.write(compressor.finish())
+
+
+def compressors():
+    """拡張子 → 圧縮関数（どちらも最大圧縮率）"""
+    methods = {'.gz': gzip_stream}
+    if brotli is not None:
+        methods['.br'] = brotli_stream
+    return methods
+
+
+def default_targets():
+    """圧縮するファイル（生成したHTML・共通アセット・検索インデックス）"""
+    paths = glob.glob(os.path.join(BASE_DIR, '*.html'))
+    paths += glob.glob(os.path.join(BASE_DIR, '*_Tutorial_Complete', '*.html'))
+    paths += glob.glob(os.path.join(BASE_DIR, 'assets', '*.css'))
+    paths += glob.glob(os.path.join(BASE_DIR, 'assets', '*.js'))
+    paths += glob.glob(os.path.join(BASE_DIR, 'search', '*.json'))
+    # 画像は PNG などすでに圧縮された形式が多いので、SVG だけを圧縮する
+    paths += glob.glob(os.path.join(BASE_DIR, 'assets', 'media', '*.svg'))
+    return sorted(paths)
+
+
+def load_cache():
+    """前回圧縮したときのファイルのハッシュを読み込む"""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    tmp_file = CACHE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, CACHE_FILE)
+
+
+def compress_file(path, extension, compress):
+    """1つのファイルを少しずつ読みながら圧縮して隣に書き出し、(パス, 圧縮後のサイズ) を返す"""
+    output = path + extension
+    # 圧縮途中のファイルが配信されないように、置き換えで保存する
+    tmp_file = output + '.tmp'
+    with open(path, 'rb') as src, open(tmp_file, 'wb') as dst:
+        compress(src, dst)
+    os.replace(tmp_file, output)
+    return output, os.path.getsize(output)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_stale(path, variant):
+    """圧縮済みファイルがないか、元のファイルより古ければ True（serve_tutorials.py はこれを配信しない）"""
+    try:
+        return os.stat(variant).st_mtime_ns < os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+def precompress(paths=None, jobs=None, force=False):
+    """内容が変わったファイルと古くなった圧縮済みファイルだけを並列に圧縮し、書き出したファイルのリストを返す
+
+    zlib と brotli は圧縮中にGILを解放するので、スレッドで並列に処理できる。
+    """
+    if paths is None:
+        paths = default_targets()
+    methods = compressors()
+
+    cache = load_cache()
+    hashes = {}
+    tasks = []
+    for path in paths:
+        name = os.path.relpath(os.path.abspath(path), BASE_DIR)
+        hashes[name] = file_hash(path)
+        for extension, compress in methods.items():
+            if force or cache.get(name) != hashes[name] or is_stale(path, path + extension):
+                tasks.append((path, extension, compress))
+
+    written = []
+    if tasks:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(compress_file, *task) for task in tasks]
+            for future in futures:
+                written.append(future.result())
+
+    # 古いハッシュの残っているアセットなど、もうないファイルの記録は捨てる
+    cache = {name: digest for name, digest in cache.items()
+             if os.path.exists(os.path.join(BASE_DIR, name))}
+    cache.update(hashes)
+    save_cache(cache)
+    remove_orphans()
+    return written
+
+
+def remove_orphans():
+    """元のファイルがなくなった .gz / .br を削除する"""
+    for extension in ('.gz', '.br'):
+        for pattern in ('*.html', os.path.join('*_Tutorial_Complete', '*.html'),
+                        os.path.join('assets', '*'), os.path.join('assets', 'media', '*'),
+                        os.path.join('search', '*')):
+            for path in glob.glob(os.path.join(BASE_DIR, pattern + extension)):
+                if not os.path.exists(path[:-len(extension)]):
+                    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成したファイルの .gz / .br を作る')
+    parser.add_argument('paths', nargs='*', help='圧縮するファイル（省略時は生成済みのHTMLとアセット）')
+    parser.add_argument('-f', '--force', action='store_true', help='変更がなくても圧縮し直す')
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli がインストールされていないため、.br は作りません（pip install brotli）。")
+
+    written = precompress(args.paths or None, force=args.force)
+    for path, size in written:
+        print(f"{os.path.relpath(path, BASE_DIR)} を生成しました。（{size:,} bytes）")
+    if not written:
+        print("変更されたファイルはありませんでした。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+各チュートリアルの例（*_tutorial/examples/*.py）を実行し、出力をHTMLに埋め込むためのスクリプト
+
+例のスクリプトを1つずつ別々のPythonプロセスで実行し、標準出力と図（PNG/SVG）を集める。
+図は plt.savefig() で保存されたファイルと、plt.show() の時点で開いている図の両方を集め、
+asset_store.py の置き場（assets/media/、内容のハッシュがファイル名）に入れる。
+チュートリアルをまたいで同じ図ができても、ファイルは1つだけになる。
+
+結果はスクリプトとライブラリのバージョンのハッシュごとに .build_cache/ に記録し、
+変更のない例は実行し直さない。
+
+埋め込む場所は、例のタイトル（docstring の「例N: ～」や先頭のコメント）に
+いちばん近い ## / ### の見出しの節の末尾。近い見出しがない例は最後にまとめる。
+build_tutorials.py --examples で使う。
+
+使い方:
+    python run_examples.py                        # 全チュートリアルの例を実行して結果を表示
+    python run_examples.py NumPy_Tutorial_Complete.md
+    python run_examples.py --force                # 記録を無視してすべて実行し直す
+"""
+
+import argparse
+import ast
+import glob
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from asset_store import image_html, load_references, record_references, remove_media, store_file
+from build_search import tokenize
+from check_code_blocks import MISSING_MODULE_RE, last_error_line, library_versions
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXAMPLE_CACHE_FILE = os.path.join(BASE_DIR, '.build_cache', 'examples.json')
+DEFAULT_TIMEOUT = 60
+
+# 実行方法や結果の形式を変えたら上げる（記録が無効になる）
+EXAMPLE_VERSION = 2
+
+# 埋め込む出力の上限（長すぎる出力は途中で切る）
+MAX_OUTPUT_LINES = 200
+MAX_FIGURES = 12
+FIGURE_EXTENSIONS = ('.png', '.svg')
+
+# 例のタイトルと見出しがこれ以上似ていれば、その見出しの節に埋め込む
+MATCH_THRESHOLD = 0.3
+
+EXAMPLE_TITLE_RE = re.compile(r'例\d+\s*[:：]\s*(.+)')
+COMMENT_TITLE_RE = re.compile(r'^#\s*\S+\.py\s*-\s*(.+)')
+HEADING_RE = re.compile(r'^(#{2,3}) +(.+?)\s*(\{[^}]*\})?\s*$')
+HEADING_NUMBER_RE = re.compile(r'^\d+(\.\d+)*\.?\s*')
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+
+# 各例の実行用のスクリプト
+# matplotlib を使う例では、plt.show() の時点で開いている図を PNG で保存する
+RUNNER = """\
+import os, runpy, sys
+script = sys.argv[1]
+sys.argv = [script]
+if os.environ.get('TUTORIAL_USES_MATPLOTLIB'):
+    import matplotlib.pyplot as plt
+    shown = [0]
+    def show(*args, **kwargs):
+        for number in plt.get_fignums():
+            shown[0] += 1
+            plt.figure(number).savefig(f'_shown_{shown[0]:03d}.png', dpi=80)
+        plt.close('all')
+    plt.show = show
+runpy.run_path(script, run_name='__main__')
+"""
+
+
+def examples_dir(source):
+    """チュートリアルのMarkdownに対応する例のディレクトリ（NumPy_Tutorial_Complete.md → numpy_tutorial/examples）"""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    name = stem.replace('_Complete', '').lower()
+    return os.path.join(os.path.dirname(os.path.abspath(source)), name, 'examples')
+
+
+def find_examples(source):
+    return sorted(glob.glob(os.path.join(examples_dir(source), '*.py')))
+
+
+def example_title(script):
+    """例のタイトル（docstring の「例N: ～」、なければ先頭のコメントの「ファイル名 - ～」）"""
+    with open(script, 'r', encoding='utf-8') as f:
+        code = f.read()
+    try:
+        docstring = ast.get_docstring(ast.parse(code)) or ''
+    except SyntaxError:
+        docstring = ''
+    match = EXAMPLE_TITLE_RE.search(docstring)
+    if match:
+        return match.group(1).strip()
+    for line in code.splitlines()[:5]:
+        match = COMMENT_TITLE_RE.match(line)
+        if match:
+            return match.group(1).strip()
+    return os.path.splitext(os.path.basename(script))[0]
+
+
+def similarity(a, b):
+    """2つのタイトルの似ている度合い（検索と同じ区切り方で数えたダイス係数）"""
+    tokens_a, tokens_b = set(tokenize(a)), set(tokenize(b))
+    if not tokens_a or not tokens_b:
+        return 0.0
+    return 2 * len(tokens_a & tokens_b) / (len(tokens_a) + len(tokens_b))
+
+
+def iter_headings(lines):
+    """## / ### の見出しを (行番号, レベル, 番号などを除いた見出し) で返す（コードブロック内は除く）"""
+    fence = None
+    for number, line in enumerate(lines):
+        match = FENCE_RE.match(line)
+        if fence is None:
+            if match:
+                fence = match.group(1)
+                continue
+            heading = HEADING_RE.match(line)
+            if heading:
+                title = HEADING_NUMBER_RE.sub('', heading.group(2))
+                yield number, len(heading.group(1)), title
+        elif match and line.strip() == match.group(1) and match.group(1).startswith(fence):
+            fence = None
+
+
+def section_end(headings, index, line_count):
+    """headings[index] の節が終わる行（次の同じか上のレベルの見出し）"""
+    level = headings[index][1]
+    for number, other_level, _ in headings[index + 1:]:
+        if other_level <= level:
+            return number
+    return line_count
+
+
+def match_sections(lines, titles):
+    """例のタイトルごとに、埋め込む行番号（いちばん近い見出しの節の末尾）を返す
+
+    近い見出しがないものは None。
+    """
+    headings = list(iter_headings(lines))
+    positions = {}
+    for title in titles:
+        best = None
+        best_score = MATCH_THRESHOLD
+        for index, (_, level, heading) in enumerate(headings):
+            # 同じくらい似ていれば ## の見出しを選ぶ
+            score = similarity(title, heading) + (0.01 if level == 2 else 0)
+            if score >= best_score:
+                best, best_score = index, score
+        positions[title] = None if best is None else section_end(headings, best, len(lines))
+    return positions
+
+
+def script_key(script, versions):
+    """スクリプト・例のディレクトリのデータ・ライブラリのバージョンから結果を識別するハッシュを作る"""
+    digest = hashlib.sha256(json.dumps({
+        'example_version': EXAMPLE_VERSION,
+        'python': sys.version,
+        'libraries': versions,
+    }, sort_keys=True).encode('utf-8'))
+    with open(script, 'rb') as f:
+        digest.update(f.read())
+    # 例が読み込むデータファイル（.py 以外）も含める
+    example_dir = os.path.dirname(script)
+    for path in sorted(glob.glob(os.path.join(example_dir, '**', '*'), recursive=True)):
+        if os.path.isfile(path) and not path.endswith(('.py', '.pyc')):
+            digest.update(os.path.relpath(path, example_dir).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def collect_figures(work_dir, before):
+    """実行中に作られた図のファイルを、作られた順に返す"""
+    figures = []
+    for root, _, files in os.walk(work_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.lower().endswith(FIGURE_EXTENSIONS) and path not in before:
+                figures.append(path)
+    figures.sort(key=lambda path: (os.path.getmtime(path), path))
+    return figures
+
+
+def run_example(script, timeout=DEFAULT_TIMEOUT):
+    """例のスクリプトを一時ディレクトリで実行し、結果の辞書を返す
+
+    {'status': 'pass' / 'fail' / 'skip', 'stdout': 標準出力, 'figures': [図のパス], 'error': エラー}
+    例のディレクトリごと一時ディレクトリにコピーして実行するので、
+    同梱のデータファイルは読めて、例が書き出すファイルはリポジトリに残らない。
+    """
+    with open(script, 'r', encoding='utf-8') as f:
+        uses_matplotlib = re.search(r'^\s*(import|from)\s+(matplotlib|seaborn)', f.read(), re.MULTILINE)
+    env = dict(
+        os.environ, MPLBACKEND='Agg', PYTHONDONTWRITEBYTECODE='1', PYTHONIOENCODING='utf-8',
+        # SVGなどに日時を書き込ませず、同じ図なら同じファイルにする
+        SOURCE_DATE_EPOCH='0',
+        TUTORIAL_USES_MATPLOTLIB='1' if uses_matplotlib else '',
+    )
+    with tempfile.TemporaryDirectory(prefix='tutorial_example_') as tmp_dir:
+        work_dir = os.path.join(tmp_dir, 'examples')
+        shutil.copytree(os.path.dirname(script), work_dir,
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        before = set(collect_figures(work_dir, set()))
+        try:
+            result = subprocess.run(
+                [sys.executable, '-c', RUNNER, os.path.basename(script)], cwd=work_dir, env=env,
+                input='\n' * 100, capture_output=True, text=True,
+                encoding='utf-8', errors='replace', timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return {'status': 'fail', 'stdout': '', 'figures': [],
+                    'error': f'{timeout}秒以内に終わりませんでした'}
+
+        if result.returncode != 0:
+            missing = MISSING_MODULE_RE.search(result.stderr)
+            if missing:
+                return {'status': 'skip', 'stdout': '', 'figures': [],
+                        'error': f"{missing.group(1)} がインストールされていません"}
+            return {'status': 'fail', 'stdout': result.stdout, 'figures': [],
+                    'error': last_error_line(result.stderr)}
+
+        figures = [store_file(path) for path in collect_figures(work_dir, before)[:MAX_FIGURES]]
+    return {'status': 'pass', 'stdout': result.stdout, 'figures': figures, 'error': ''}
+
+
+def load_cache():
+    try:
+        with open(EXAMPLE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(EXAMPLE_CACHE_FILE), exist_ok=True)
+    tmp_file = EXAMPLE_CACHE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_file, EXAMPLE_CACHE_FILE)
+
+
+def run_examples(sources, jobs=None, timeout=DEFAULT_TIMEOUT, force=False):
+    """チュートリアルの例を並列に実行し、{ソース: [例ごとの結果]} を返す
+
+    各例は別プロセスで動くので、スレッドはプロセスの終了を待つだけになる。
+    結果には 'script'（ファイル名）と 'title' も入る。
+    """
+    versions = library_versions()
+    # チュートリアル → {スクリプトのハッシュ: 結果}
+    cache = load_cache()
+    previous_figures = figure_urls(cache)
+
+    results = {}
+    pending = []
+    for source in sources:
+        name = os.path.relpath(os.path.abspath(source), BASE_DIR)
+        recorded = {} if force else cache.get(name, {})
+        results[source] = []
+        for script in find_examples(source):
+            key = script_key(script, versions)
+            result = {
+                'script': os.path.basename(script),
+                'title': example_title(script),
+                'key': key,
+            }
+            cached = recorded.get(key)
+            if cached and all(os.path.exists(os.path.join(BASE_DIR, path))
+                              for path in cached['figures']):
+                result.update(cached)
+            else:
+                pending.append((result, script))
+            results[source].append(result)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            futures = [executor.submit(run_example, script, timeout) for _, script in pending]
+            for (result, _), future in zip(pending, futures):
+                result.update(future.result())
+
+    # スキップした例は、ライブラリを入れたら実行し直したいので記録しない
+    for source, source_results in results.items():
+        cache[os.path.relpath(os.path.abspath(source), BASE_DIR)] = {
+            result['key']: {key: result[key] for key in ('status', 'stdout', 'figures', 'error')}
+            for result in source_results if result['status'] != 'skip'
+        }
+    save_cache(cache)
+    update_figures(cache, previous_figures)
+    return results
+
+
+def figure_urls(cache):
+    return {url for entries in cache.values() for entry in entries.values() for url in entry['figures']}
+
+
+def update_figures(cache, previous):
+    """使われなくなった図を置き場から削除し、図の参照を記録する
+
+    同じ内容の画像はMarkdownの画像（page:<名前> として記録したもの）と同じファイルになるので、
+    ページが使っている画像は消さない。
+    """
+    in_pages = {url for name, urls in load_references().items() if not name.startswith('examples:')
+                for url in urls}
+    remove_media(previous - figure_urls(cache) - in_pages)
+    for name, entries in cache.items():
+        record_references(f'examples:{name}', [
+            url for entry in entries.values() for url in entry['figures']
+        ])
+
+
+def truncate_output(stdout):
+    lines = stdout.rstrip('\n').splitlines()
+    if len(lines) > MAX_OUTPUT_LINES:
+        omitted = len(lines) - MAX_OUTPUT_LINES
+        lines = lines[:MAX_OUTPUT_LINES] + [f'…（残り{omitted}行は省略）']
+    return '\n'.join(lines)
+
+
+def output_html(result):
+    """1つの例の実行結果を、Markdownにそのまま入れられるHTMLのブロックにする"""
+    parts = [
+        '<div class="example-output">',
+        f'<p class="example-output-title">実行結果: <code>{html.escape(result["script"])}</code></p>',
+    ]
+    if result['stdout'].strip():
+        # 空行があってもHTMLのブロックが途中で終わらないように、改行は文字参照にする
+        stdout = html.escape(truncate_output(result['stdout'])).replace('\n', '&#10;')
+        parts.append(f'<pre class="example-output-stdout">{stdout}</pre>')
+    for number, url in enumerate(result['figures'], 1):
+        parts.append(image_html(url, f'{result["script"]} の図{number}'))
+    parts.append('</div>')
+    return '\n'.join(parts)
+
+
+def embed_examples(md_content, results):
+    """成功した例の出力を、対応する見出しの節の末尾に入れたMarkdownを返す"""
+    results = [result for result in results if result['status'] == 'pass']
+    if not results:
+        return md_content
+
+    lines = md_content.splitlines()
+    positions = match_sections(lines, [result['title'] for result in results])
+    inserts = {}
+    unmatched = []
+    for result in results:
+        position = positions[result['title']]
+        if position is None:
+            unmatched.append(result)
+        else:
+            inserts.setdefault(position, []).append(output_html(result))
+
+    output = []
+    for number, line in enumerate(lines + ['']):
+        for block in inserts.get(number, []):
+            output.extend(['', block, ''])
+        if number < len(lines):
+            output.append(line)
+    if unmatched:
+        output.extend(['', '## 例の実行結果', ''])
+        for result in unmatched:
+            output.extend([f'### {result["title"]}', '', output_html(result), ''])
+    return '\n'.join(output) + '\n'
+
+
+def results_key(results):
+    """埋め込む内容を識別するハッシュ（ビルドキャッシュのキーに使う）"""
+    return hashlib.sha256(json.dumps([
+        (result['key'], result['status']) for result in results
+    ]).encode('utf-8')).hexdigest()
+
+
+def md_lines(source):
+    with open(source, 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def main():
+    from build_tutorials import discover_sources
+
+    parser = argparse.ArgumentParser(description='チュートリアルの例を実行して出力を集める')
+    parser.add_argument('sources', nargs='*',
+                        help='例を実行するチュートリアルのMarkdownファイル（省略時は全チュートリアル）')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='同時に実行する例の数（省略時はCPUコア数）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='1つの例の制限時間（秒）')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='前回の結果を使わずにすべて実行し直す')
+    args = parser.parse_args()
+
+    results = run_examples(args.sources or discover_sources(), jobs=args.jobs,
+                           timeout=args.timeout, force=args.force)
+    for source, source_results in results.items():
+        lines = md_lines(source)
+        positions = match_sections(lines, [result['title'] for result in source_results])
+        print(os.path.basename(source))
+        for result in source_results:
+            position = positions[result['title']]
+            place = '（最後にまとめる）' if position is None else f'{position + 1}行目の前'
+            status = {'pass': '成功', 'fail': '失敗', 'skip': 'スキップ'}[result['status']]
+            detail = f"図{len(result['figures'])}枚" if result['status'] == 'pass' else result['error']
+            print(f"    {result['script']:<32} {status} {detail} → {place}")
+
+
+if __name__ == "__main__":
+    main()
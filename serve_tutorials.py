@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+ビルドしたチュートリアルを配信する静的ファイルサーバー（Flask）
+
+index.html・各チュートリアルのHTML（章ごとのページも）・assets/・search/ だけを配信し、
+Markdownやスクリプトなどリポジトリのほかのファイルは返さない。
+
+- ETag は precompress.py が .build_cache/ に記録した内容のハッシュを使う（強いETag）。
+  記録より新しいファイルは、その場でハッシュを計算する（更新時刻とサイズが同じ間は使い回す）。
+  If-None-Match が一致すれば 304 を、Range があれば部分的な内容（206）を返す。
+- Accept-Encoding に合わせて、隣にある .br / .gz をそのまま返す（配信のたびに圧縮しない）。
+- ファイル名に内容のハッシュが入ったアセット（assets/tutorial.<hash>.css や assets/media/<hash>.png）と、
+  ?v=<hash> 付きで読まれる検索インデックスは、1年間キャッシュさせる（immutable）。
+  HTMLなどほかのファイルは no-cache にして、毎回 ETag で確かめさせる。
+- 本文はファイルのまま WSGI サーバーに渡すので、gunicorn などでは sendfile でコピーせずに送られる。
+  前に nginx などを置く場合は --x-sendfile で X-Sendfile ヘッダーだけを返せる。
+
+使い方:
+    python serve_tutorials.py                 # http://127.0.0.1:8000/ で配信
+    python serve_tutorials.py --host 0.0.0.0 --port 8080
+    python serve_tutorials.py --x-sendfile    # 本文の送信をフロントのサーバーに任せる
+    gunicorn -w 4 serve_tutorials:app         # 本番ではWSGIサーバーから使う（sendfileで送信）
+"""
+
+import argparse
+import functools
+import json
+import mimetypes
+import os
+import re
+
+from flask import Flask, abort, request, send_file
+
+from precompress import CACHE_FILE as HASH_FILE
+from precompress import file_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 配信するファイル（ビルドの出力だけ）
+SERVED_PATH_RE = re.compile(
+    r'^(?:[^/]+\.html|[^/]+_Tutorial_Complete/[^/]+\.html'
+    r'|assets/[^/]+|assets/media/[^/]+|search/[^/]+\.json)$'
+)
+# ファイル名に内容のハッシュが入っているアセット
+FINGERPRINTED_RE = re.compile(r'^assets/(?:[^/]+\.[0-9a-f]{12}\.(?:css|js)|media/[0-9a-f]{16}\.\w+)$')
+# 圧縮済みファイルの拡張子と Content-Encoding（優先する順）
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+app = Flask(__name__, static_folder=None)
+app.config['TUTORIAL_ROOT'] = BASE_DIR
+
+_build_hashes = {'mtime': None, 'hashes': {}}
+
+
+def build_hashes():
+    """precompress.py が記録したファイルのハッシュと、記録した時刻（記録が更新されたら読み直す）"""
+    try:
+        mtime = os.stat(HASH_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return {}, 0
+    if _build_hashes['mtime'] != mtime:
+        try:
+            with open(HASH_FILE, 'r', encoding='utf-8') as f:
+                hashes = json.load(f)
+        except ValueError:
+            # 書き換えの途中なら、前回読んだものを使う
+            hashes = _build_hashes['hashes']
+        _build_hashes.update(mtime=mtime, hashes=hashes)
+    return _build_hashes['hashes'], mtime
+
+
+@functools.lru_cache(maxsize=4096)
+def computed_hash(path, mtime_ns, size):
+    """記録のないファイルの内容のハッシュ（更新時刻とサイズが同じ間は計算し直さない）"""
+    return file_hash(path)
+
+
+def content_hash(name, path, stat):
+    """ファイルの内容のハッシュ（ビルド時の記録があればそれを使う）"""
+    # 記録はこのリポジトリでビルドしたファイルのもの
+    if app.config['TUTORIAL_ROOT'] == BASE_DIR:
+        hashes, recorded_at = build_hashes()
+        recorded = hashes.get(name.replace('/', os.sep))
+        if recorded and stat.st_mtime_ns <= recorded_at:
+            return recorded
+    return computed_hash(path, stat.st_mtime_ns, stat.st_size)
+
+
+def accepted_encodings():
+    """リクエストの Accept-Encoding で受け取れる圧縮形式（q=0 のものを除く）"""
+    return {encoding for encoding in request.accept_encodings.values()
+            if request.accept_encodings[encoding] > 0}
+
+
+def precompressed_variant(path, stat):
+    """返せる圧縮済みファイル (Content-Encoding, パス)。なければ (None, path)"""
+    accepted = accepted_encodings()
+    for encoding, extension in ENCODINGS:
+        if encoding not in accepted:
+            continue
+        try:
+            variant_stat = os.stat(path + extension)
+        except FileNotFoundError:
+            continue
+        # 元のファイルより古い圧縮済みファイルは、内容が違うかもしれないので使わない
+        if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+            return encoding, path + extension
+    return None, path
+
+
+def has_variants(path):
+    return any(os.path.exists(path + extension) for _, extension in ENCODINGS)
+
+
+def resolve(name):
+    """URLのパスを配信するファイルのパスにする（配信しないものは None）"""
+    if name == '' or name.endswith('/'):
+        name += 'index.html'
+    if not SERVED_PATH_RE.match(name) or '..' in name.split('/'):
+        return None, None
+    path = os.path.join(app.config['TUTORIAL_ROOT'], *name.split('/'))
+    if not os.path.isfile(path):
+        return None, None
+    return name, path
+
+
+@app.route('/', defaults={'name': ''})
+@app.route('/<path:name>')
+def serve(name):
+    name, path = resolve(name)
+    if path is None:
+        abort(404)
+
+    stat = os.stat(path)
+    digest = content_hash(name, path, stat)
+    encoding, body_path = precompressed_variant(path, stat)
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    immutable = FINGERPRINTED_RE.match(name) or (name.startswith('search/') and 'v' in request.args)
+    response = send_file(
+        body_path,
+        mimetype=mimetype,
+        conditional=True,
+        # 圧縮形式ごとに中身が違うので、ETag も分ける
+        etag=digest[:32] + (f'-{encoding}' if encoding else ''),
+        max_age=IMMUTABLE_MAX_AGE if immutable else None,
+        last_modified=stat.st_mtime,
+    )
+    # send_file は元のファイル名を付けるが、ページとして表示させたいので外す
+    response.headers.pop('Content-Disposition', None)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if immutable:
+        response.cache_control.immutable = True
+    if encoding or has_variants(path):
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ビルドしたチュートリアルを配信する')
+    parser.add_argument('--host', default='127.0.0.1', help='待ち受けるアドレス')
+    parser.add_argument('--port', type=int, default=8000, help='待ち受けるポート')
+    parser.add_argument('--root', default=BASE_DIR, help='配信するディレクトリ（ビルドの出力先）')
+    parser.add_argument('--x-sendfile', action='store_true',
+                        help='本文を送らずに X-Sendfile ヘッダーを返す（nginx / Apache の後ろで使う）')
+    parser.add_argument('--debug', action='store_true', help='デバッグモードで起動する')
+    args = parser.parse_args()
+
+    app.config['TUTORIAL_ROOT'] = os.path.abspath(args.root)
+    app.config['USE_X_SENDFILE'] = args.x_sendfile
+    app.run(host=args.host, port=args.port, debug=args.debug)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+チュートリアルのビルドとMarkdownの変換を、ほかのPythonのコードから使うためのモジュール
+
+build_tutorials.py の CLI はメッセージを表示するだけだが、こちらは結果を値で返し、
+失敗したときは BuildError のサブクラスを投げる（メッセージは表示しない）。
+CIやFlaskのアプリから、別のPythonを起動せずにプロセスの中で変換できる。
+
+    build(sources, options)   チュートリアルをビルドし、BuildResult（チュートリアルごとの結果と秒数）を返す
+    render(markdown_str)      MarkdownをHTML本文にし、RenderResult（HTML・見出し・秒数）を返す
+
+変換器はテンプレートとバックエンドごとにプロセスの中で使い回すので、2回目からの render() は速い。
+同じ変換器を複数のスレッドから使っても壊れないように、変換の間はロックをかける。
+
+使い方:
+    from tutorial_builder import BuildOptions, build, render
+
+    result = build(['NumPy_Tutorial_Complete.md'], BuildOptions(force=True))
+    for tutorial in result.built:
+        print(tutorial.output, tutorial.elapsed)
+
+    page = render('# 見出し\\n\\n本文', template='flask')
+    page.html, page.headings
+
+    python tutorial_builder.py NumPy_Tutorial_Complete.md   # HTML本文を標準出力に書く（- なら標準入力）
+"""
+
+import argparse
+import collections
+import dataclasses
+import os
+import sys
+import threading
+import time
+
+import build_tutorials
+from build_tutorials import BuildError, ManifestError, SourceNotFoundError, TutorialBuildError
+
+__all__ = [
+    'BuildError', 'ManifestError', 'SourceNotFoundError', 'TutorialBuildError', 'RenderError',
+    'BuildOptions', 'TutorialResult', 'BuildResult', 'RenderResult', 'build', 'render',
+]
+
+DEFAULT_TEMPLATE = 'library'
+
+# 変換器（テンプレートとバックエンドごと）を同時に使わないためのロック
+_converter_locks = collections.defaultdict(threading.Lock)
+
+
+class RenderError(BuildError):
+    """Markdownを変換できなかった（テンプレートやバックエンドが不明・変換中の例外）"""
+
+
+@dataclasses.dataclass
+class BuildOptions:
+    """build() の設定（build_tutorials.py のコマンドラインオプションと同じ意味）"""
+
+    jobs: int = None
+    force: bool = False
+    compress: bool = True
+    split: bool = False
+    examples: bool = False
+    backend: str = None
+    # 進み具合のメッセージを受け取る関数（None なら表示しない）
+    log: object = None
+
+
+@dataclasses.dataclass
+class TutorialResult:
+    """1つのチュートリアルのビルド結果（skipped なら変更がなく、前回の出力のまま）"""
+
+    source: str
+    output: str
+    skipped: bool
+    size: int = 0
+    elapsed: float = 0.0
+    sections_converted: int = 0
+    split_pages: list = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class BuildResult:
+    """build() の結果（tutorials は渡したソースの順）"""
+
+    tutorials: list
+    elapsed: float
+
+    @property
+    def built(self):
+        return [tutorial for tutorial in self.tutorials if not tutorial.skipped]
+
+    @property
+    def skipped(self):
+        return [tutorial for tutorial in self.tutorials if tutorial.skipped]
+
+
+@dataclasses.dataclass
+class RenderResult:
+    """render() の結果（headings は見出しの level・id・name などの辞書のリスト）"""
+
+    html: str
+    headings: list
+    template: str
+    backend: str
+    elapsed: float
+
+
+def build(sources=None, options=None):
+    """チュートリアルをビルドし、BuildResult を返す（sources を省略すると tutorials.toml のすべて）
+
+    変更のないチュートリアルはビルドキャッシュを見てスキップし、skipped=True の結果にする。
+    失敗したときは ManifestError・SourceNotFoundError・TutorialBuildError を投げ、
+    共通アセット・例の実行・検索インデックス・圧縮のように特定のチュートリアルによらない失敗は BuildError を投げる。
+    """
+    options = options or BuildOptions()
+    sources = list(sources or build_tutorials.discover_sources())
+    start = time.perf_counter()
+    results = build_tutorials.build(
+        sources, jobs=options.jobs, force=options.force, compress=options.compress,
+        split=options.split, examples=options.examples, backend=options.backend,
+        log=options.log or (lambda message: None),
+    )
+    elapsed = time.perf_counter() - start
+
+    built = {result[0]: result for result in results}
+    tutorials = []
+    for source in sources:
+        if source in built:
+            _, output, size, seconds, converted, split_pages = built[source]
+            tutorials.append(TutorialResult(source, output, False, size, seconds, converted, split_pages))
+        else:
+            tutorials.append(TutorialResult(source, build_tutorials.output_path(source), True))
+    return BuildResult(tutorials, elapsed)
+
+
+def render(markdown_str, template=DEFAULT_TEMPLATE, backend=None):
+    """Markdownの文字列をテンプレートの拡張機能でHTML本文に変換し、RenderResult を返す
+
+    ページ全体（ナビゲーションやCSS）は付けない。backend を省略するとテンプレートの設定に従う。
+    """
+    if template not in build_tutorials.TEMPLATES:
+        raise RenderError(f"テンプレート {template} の設定がありません"
+                          f"（{', '.join(build_tutorials.TEMPLATES)} のどれか）")
+    backend = backend or build_tutorials.markdown_backend({'template': template})
+
+    start = time.perf_counter()
+    try:
+        converter = build_tutorials.get_converter(template, backend)
+    except (ValueError, RuntimeError) as e:
+        # 不明なバックエンドや、インストールされていないバックエンド
+        raise RenderError(str(e)) from e
+    with _converter_locks[template, backend]:
+        try:
+            html_body = converter.convert(markdown_str)
+            headings = converter.headings()
+        except Exception as e:
+            raise RenderError(f"変換に失敗しました: {type(e).__name__}: {e}") from e
+    return RenderResult(html_body, headings, template, backend, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MarkdownをHTML本文に変換して標準出力に書く')
+    parser.add_argument('source', help='変換するMarkdownファイル（- なら標準入力）')
+    parser.add_argument('--template', default=None,
+                        help='拡張機能の設定に使うテンプレート（省略時は tutorials.toml のチュートリアルの設定）')
+    parser.add_argument('--backend', help='Markdownのバックエンド（省略時はテンプレートの設定）')
+    args = parser.parse_args()
+
+    if args.source == '-':
+        md_content = sys.stdin.read()
+    else:
+        with open(args.source, 'r', encoding='utf-8') as f:
+            md_content = f.read()
+    template = args.template or build_tutorials.tutorial_settings(
+        os.path.abspath(args.source) if args.source != '-' else 'stdin.md'
+    )['template']
+
+    try:
+        result = render(md_content, template=template, backend=args.backend)
+    except BuildError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(result.html + '\n')
+    print(f"{result.backend} で {result.elapsed:.3f}秒", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
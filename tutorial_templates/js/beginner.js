@@ -0,0 +1,54 @@
+// ページトップに戻る機能
+document.querySelector('.back-to-top').addEventListener('click', function(e) {
+    e.preventDefault();
+    window.scrollTo({
+        top: 0,
+        behavior: 'smooth'
+    });
+});
+
+// 目次リンクのスムーススクロール
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', function (e) {
+        e.preventDefault();
+        // idが数字で始まる見出し（#1-numpy など）はCSSセレクターにならないので getElementById で探す
+        const target = document.getElementById(decodeURIComponent(this.getAttribute('href').slice(1)));
+        if (target) {
+            target.scrollIntoView({
+                behavior: 'smooth',
+                block: 'start'
+            });
+        }
+    });
+});
+
+// コードブロックにコピー機能を追加
+document.querySelectorAll('pre').forEach(pre => {
+    const button = document.createElement('button');
+    button.textContent = 'コピー';
+    button.style.cssText = `
+        position: absolute;
+        top: 10px;
+        right: 10px;
+        background: #3498db;
+        color: white;
+        border: none;
+        padding: 5px 10px;
+        border-radius: 3px;
+        cursor: pointer;
+        font-size: 12px;
+    `;
+
+    pre.style.position = 'relative';
+    pre.appendChild(button);
+
+    button.addEventListener('click', () => {
+        const code = pre.querySelector('code') || pre;
+        navigator.clipboard.writeText(code.textContent).then(() => {
+            button.textContent = 'コピー完了!';
+            setTimeout(() => {
+                button.textContent = 'コピー';
+            }, 2000);
+        });
+    });
+});
@@ -0,0 +1,205 @@
+// 全チュートリアルの全文検索（インデックスは build_search.py が search/ に作る）
+(function () {
+    // search/ の場所はこのスクリプト（assets/tutorial.<hash>.js）から求める
+    const script = document.currentScript;
+    if (!script || !script.src) return;
+    const root = new URL('../', script.src);
+    const searchDir = new URL('search/', root);
+
+    // build_search.py の tokenize と同じ規則で区切る
+    const TOKEN_RE = /[a-z0-9_]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+/g;
+    const MAX_RESULTS = 20;
+
+    function tokenize(text) {
+        const tokens = [];
+        const words = text.normalize('NFKC').toLowerCase().match(TOKEN_RE) || [];
+        for (const word of words) {
+            if (/^[a-z0-9_]/.test(word)) {
+                if (word.length > 1) tokens.push(word);
+            } else if (word.length === 1) {
+                tokens.push(word);
+            } else {
+                for (let i = 0; i < word.length - 1; i++) tokens.push(word.slice(i, i + 2));
+            }
+        }
+        return tokens;
+    }
+
+    let manifest = null;
+    let termIndex = null;
+    const shards = {};
+
+    function loadManifest() {
+        if (!manifest) {
+            manifest = fetch(new URL('index.json', searchDir), {cache: 'no-cache'})
+                .then(response => response.json());
+        }
+        return manifest;
+    }
+
+    // 語 → その語を含むチュートリアルの番号（build_search.py の build_term_directory）
+    function loadTermIndex() {
+        if (!termIndex) {
+            termIndex = loadManifest()
+                .then(data => fetch(new URL(data.terms, searchDir)))
+                .then(response => response.json());
+        }
+        return termIndex;
+    }
+
+    // インデックスは検索したときに初めて読み込む
+    function loadShard(tutorial) {
+        if (!shards[tutorial.shard]) {
+            shards[tutorial.shard] = fetch(new URL(tutorial.shard, searchDir))
+                .then(response => response.json());
+        }
+        return shards[tutorial.shard];
+    }
+
+    function postings(shard, token) {
+        // 英数字は前方一致（"group" で groupby も見つかる）
+        if (/^[a-z0-9_]/.test(token)) {
+            const result = [];
+            for (const term in shard.terms) {
+                if (term.startsWith(token)) result.push(shard.terms[term]);
+            }
+            return result;
+        }
+        return shard.terms[token] ? [shard.terms[token]] : [];
+    }
+
+    function candidateTutorials(index, tokens) {
+        // すべての語を含むチュートリアルの番号（ほかのインデックスは読み込まない）
+        let candidates = null;
+        for (const token of new Set(tokens)) {
+            const found = new Set();
+            for (const list of postings(index, token)) {
+                for (const number of list) found.add(number);
+            }
+            candidates = candidates === null
+                ? found
+                : new Set([...candidates].filter(number => found.has(number)));
+            if (candidates.size === 0) break;
+        }
+        return candidates || new Set();
+    }
+
+    function searchShard(shard, tokens) {
+        // すべての語を含む見出しだけを、出現回数の合計が多い順に返す
+        let scores = null;
+        for (const token of new Set(tokens)) {
+            const found = new Map();
+            for (const list of postings(shard, token)) {
+                for (let i = 0; i < list.length; i += 2) {
+                    found.set(list[i], (found.get(list[i]) || 0) + list[i + 1]);
+                }
+            }
+            if (scores === null) {
+                scores = found;
+            } else {
+                for (const [doc, score] of scores) {
+                    if (found.has(doc)) scores.set(doc, score + found.get(doc));
+                    else scores.delete(doc);
+                }
+            }
+            if (scores.size === 0) break;
+        }
+        return scores ? Array.from(scores) : [];
+    }
+
+    function currentPage() {
+        const path = location.pathname.split('/');
+        return decodeURIComponent(path[path.length - 1]);
+    }
+
+    function createWidget() {
+        const box = document.createElement('div');
+        box.className = 'site-search';
+        box.innerHTML =
+            '<input type="search" placeholder="チュートリアルを検索（/）" aria-label="チュートリアルを検索">' +
+            '<ol class="site-search-results" hidden></ol>';
+        document.body.appendChild(box);
+        return box;
+    }
+
+    const box = createWidget();
+    const input = box.querySelector('input');
+    const results = box.querySelector('.site-search-results');
+    let latest = 0;
+
+    function render(hits) {
+        results.textContent = '';
+        for (const hit of hits.slice(0, MAX_RESULTS)) {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = new URL(hit.tutorial.href + '#' + hit.id, root).href;
+            link.textContent = hit.title;
+            const source = document.createElement('span');
+            source.textContent = hit.tutorial.title;
+            link.appendChild(source);
+            item.appendChild(link);
+            results.appendChild(item);
+        }
+        if (!hits.length) {
+            const item = document.createElement('li');
+            item.className = 'site-search-empty';
+            item.textContent = '見つかりませんでした';
+            results.appendChild(item);
+        }
+        results.hidden = false;
+    }
+
+    async function search(query) {
+        const request = ++latest;
+        const tokens = tokenize(query);
+        if (!tokens.length) {
+            results.hidden = true;
+            return;
+        }
+        const [{tutorials}, index] = await Promise.all([loadManifest(), loadTermIndex()]);
+        const candidates = candidateTutorials(index, tokens);
+        const page = currentPage();
+        const hits = [];
+        await Promise.all(tutorials.filter((_, number) => candidates.has(number)).map(async tutorial => {
+            const shard = await loadShard(tutorial);
+            // 今読んでいるチュートリアルの結果を上に出す
+            const bonus = tutorial.href === page ? 1000 : 0;
+            for (const [doc, score] of searchShard(shard, tokens)) {
+                const [id, title] = shard.docs[doc];
+                hits.push({tutorial, id, title, score: score + bonus});
+            }
+        }));
+        if (request !== latest) return;
+        hits.sort((a, b) => b.score - a.score);
+        render(hits);
+    }
+
+    let timer = null;
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => search(input.value).catch(() => {
+            results.hidden = true;
+        }), 150);
+    });
+    input.addEventListener('focus', () => {
+        // 入力を始める前に一覧だけ読んでおく
+        loadTermIndex().catch(() => {});
+        if (input.value) results.hidden = false;
+    });
+    input.addEventListener('keydown', e => {
+        if (e.key === 'Escape') {
+            results.hidden = true;
+            input.blur();
+        }
+    });
+    document.addEventListener('keydown', e => {
+        if (e.key === '/' && document.activeElement !== input &&
+                !/^(INPUT|TEXTAREA|SELECT)$/.test(document.activeElement.tagName)) {
+            e.preventDefault();
+            input.focus();
+        }
+    });
+    document.addEventListener('click', e => {
+        if (!box.contains(e.target)) results.hidden = true;
+    });
+})();
@@ -0,0 +1,133 @@
+// ナビゲーションのスムーススクロール
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', function (e) {
+        e.preventDefault();
+        // idが数字で始まる見出し（#1-numpy など）はCSSセレクターにならないので getElementById で探す
+        const target = document.getElementById(decodeURIComponent(this.getAttribute('href').slice(1)));
+        if (target) {
+            target.scrollIntoView({
+                behavior: 'smooth',
+                block: 'start'
+            });
+        }
+    });
+});
+
+// ヘッダーのスクロール効果
+window.addEventListener('scroll', function() {
+    const header = document.querySelector('header');
+    if (window.scrollY > 100) {
+        header.style.background = 'rgba(255, 255, 255, 0.98)';
+        header.style.boxShadow = '0 2px 25px rgba(0, 0, 0, 0.15)';
+    } else {
+        header.style.background = 'rgba(255, 255, 255, 0.95)';
+        header.style.boxShadow = '0 2px 20px rgba(0, 0, 0, 0.1)';
+    }
+});
+
+// 統計カウンターアニメーション
+function animateCounter(element, target) {
+    let current = 0;
+    const increment = target / 50;
+    const timer = setInterval(() => {
+        current += increment;
+        if (current >= target) {
+            current = target;
+            clearInterval(timer);
+        }
+        element.textContent = Math.floor(current) + (target === parseInt(target) ? '' : '+');
+    }, 50);
+}
+
+// スクロール監視で統計アニメーションを実行
+const observer = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            const statItems = entry.target.querySelectorAll('.stat-item h3');
+            statItems.forEach((item, index) => {
+                const targets = [11, 100, 6, 1];
+                const suffixes = ['+', '+', '', ''];
+
+                setTimeout(() => {
+                    let current = 0;
+                    const target = targets[index];
+                    const timer = setInterval(() => {
+                        current += Math.ceil(target / 30);
+                        if (current >= target) {
+                            current = target;
+                            clearInterval(timer);
+                        }
+                        if (index === 3) {
+                            item.textContent = '日本語';
+                        } else {
+                            item.textContent = current + suffixes[index];
+                        }
+                    }, 50);
+                }, index * 200);
+            });
+            observer.unobserve(entry.target);
+        }
+    });
+});
+
+observer.observe(document.querySelector('.stats'));
+
+// パーティクル効果（オプション）
+function createParticle() {
+    const particle = document.createElement('div');
+    particle.style.cssText = `
+        position: fixed;
+        width: 4px;
+        height: 4px;
+        background: rgba(255, 255, 255, 0.8);
+        border-radius: 50%;
+        pointer-events: none;
+        animation: float 6s linear infinite;
+        top: 100vh;
+        left: ${Math.random() * 100}vw;
+        z-index: 1;
+    `;
+
+    document.body.appendChild(particle);
+
+    setTimeout(() => {
+        particle.remove();
+    }, 6000);
+}
+
+// CSS for particle animation
+const style = document.createElement('style');
+style.textContent = `
+    @keyframes float {
+        0% {
+            transform: translateY(0) rotate(0deg);
+            opacity: 1;
+        }
+        100% {
+            transform: translateY(-100vh) rotate(360deg);
+            opacity: 0;
+        }
+    }
+`;
+document.head.appendChild(style);
+
+// Create particles occasionally
+setInterval(createParticle, 3000);
+
+// Mobile menu toggle (if needed)
+const logo = document.querySelector('.logo');
+const nav = document.querySelector('nav');
+
+logo.addEventListener('click', function(e) {
+    if (window.innerWidth <= 768) {
+        e.preventDefault();
+        nav.style.display = nav.style.display === 'block' ? 'none' : 'block';
+    }
+});
+
+// Resize handler
+window.addEventListener('resize', function() {
+    if (window.innerWidth > 768) {
+        nav.style.display = '';
+    }
+});